@@ -0,0 +1,124 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.cache import USER_STATE_KEY
+from reviews.models import ADMIN, MODERATOR, USER, User
+
+# Claims, от которых зависят права: они сверяются с состоянием
+# пользователя. Имя можно сменить через /users/me/, его токен не несёт.
+USER_CLAIMS = ('role', 'is_superuser', 'is_staff')
+USER_STATE_FIELDS = ('username', *USER_CLAIMS, 'is_active')
+
+
+def remember_user_state(user):
+    cache.set(USER_STATE_KEY.format(user.pk),
+              {field: getattr(user, field) for field in USER_STATE_FIELDS},
+              settings.USER_STATE_CACHE_TIMEOUT)
+
+
+def get_user_state(user_id):
+    """Роль и активность пользователя из кеша или из базы.
+
+    Для удалённого пользователя - пустой словарь. Запись сбрасывается
+    при сохранении и удалении пользователя, а в других воркерах
+    устаревает не дольше USER_STATE_CACHE_TIMEOUT.
+    """
+
+    key = USER_STATE_KEY.format(user_id)
+    state = cache.get(key)
+    if state is None:
+        state = User.objects.filter(pk=user_id).values(
+            *USER_STATE_FIELDS).first() or {}
+        cache.set(key, state, settings.USER_STATE_CACHE_TIMEOUT)
+    return state
+
+
+class RoleAccessToken(AccessToken):
+    """Access-токен с ролью пользователя в claims."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        remember_user_state(user)
+        return token
+
+
+class RoleTokenUser(TokenUser):
+    """Пользователь, собранный из claims токена без запроса к базе.
+
+    Представления, которым нужна вся запись, получают её через
+    get_user_instance.
+    """
+
+    @cached_property
+    def role(self):
+        return self.token['role']
+
+    @cached_property
+    def username(self):
+        return get_user_state(self.id).get('username', '')
+
+    @property
+    def is_admin(self):
+        return self.role == ADMIN or self.is_superuser
+
+    @property
+    def is_moderator(self):
+        return self.role == MODERATOR
+
+    @property
+    def is_user(self):
+        return self.role == USER
+
+    @cached_property
+    def instance(self):
+        try:
+            user = User.objects.get(pk=self.id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed(
+                'Пользователь не найден.', code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed(
+                'Пользователь неактивен.', code='user_inactive')
+        return user
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """JWT без загрузки пользователя, если роль есть в токене.
+
+    Claims сверяются с закешированным состоянием пользователя: токен
+    удалённого, неактивного или сменившего роль пользователя
+    отклоняется. Токены без этих claims обрабатываются как
+    в JWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        if not all(claim in validated_token for claim in USER_CLAIMS):
+            return super().get_user(validated_token)
+        user = api_settings.TOKEN_USER_CLASS(validated_token)
+        state = get_user_state(user.id)
+        if not state.get('is_active'):
+            raise AuthenticationFailed(
+                'Пользователь не найден или неактивен.', code='user_inactive')
+        if any(state[claim] != validated_token[claim]
+               for claim in USER_CLAIMS):
+            raise AuthenticationFailed(
+                'Данные пользователя изменились, получите новый токен.',
+                code='token_outdated')
+        return user
+
+
+def get_user_instance(user):
+    """Модель пользователя для request.user любого вида."""
+
+    if isinstance(user, RoleTokenUser):
+        return user.instance
+    return user
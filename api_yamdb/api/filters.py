@@ -1,13 +1,18 @@
 from django_filters.rest_framework import FilterSet, CharFilter
 
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitleFilter(FilterSet):
     name = CharFilter(field_name='name', lookup_expr='contains')
     genre = CharFilter(field_name='genre__slug',)
     category = CharFilter(field_name='category__slug',)
+    search = CharFilter(method='filter_search')
 
     class Meta:
         model = Title
         fields = ('year',)
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
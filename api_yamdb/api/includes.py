@@ -0,0 +1,84 @@
+from django.conf import settings
+from django.db.models import Count, OuterRef, Subquery
+from rest_framework.exceptions import ValidationError
+from rest_framework.reverse import reverse
+from rest_framework.utils.urls import replace_query_param
+
+from reviews.models import Comment, Review
+
+from .serializers import CommentSerializer, ReviewSerializer
+
+INCLUDE_PARAM = 'include'
+INCLUDES = ('reviews', 'reviews.comments')
+
+
+def parse_includes(request):
+    """Связи из ?include=; reviews.comments включает и reviews."""
+
+    raw = request.query_params.get(INCLUDE_PARAM)
+    if not raw:
+        return frozenset()
+    requested = {name.strip() for name in raw.split(',')} - {''}
+    unknown = requested.difference(INCLUDES)
+    if unknown:
+        raise ValidationError({INCLUDE_PARAM: [
+            f'Неизвестные связи: {", ".join(sorted(unknown))}. '
+            f'Доступны: {", ".join(INCLUDES)}.']})
+    return frozenset(requested | {name.split('.')[0] for name in requested})
+
+
+def embed(results, count, url, limit):
+    """Первая страница коллекции в формате LimitOffsetPagination."""
+
+    next_url = None
+    if count > limit:
+        next_url = replace_query_param(
+            replace_query_param(url, 'limit', limit), 'offset', limit)
+    return {'count': count, 'next': next_url, 'results': results}
+
+
+def get_comments(reviews, limit):
+    """Первые limit комментариев каждого отзыва одним запросом."""
+
+    first = Comment.objects.filter(
+        review=OuterRef('review')).values('id')[:limit]
+    comments = {review.id: [] for review in reviews}
+    for comment in Comment.objects.filter(
+            review__in=list(comments), id__in=Subquery(first)).select_related(
+            'author'):
+        comments[comment.review_id].append(comment)
+    return comments
+
+
+def include_reviews(request, title, includes):
+    """Отзывы произведения и их комментарии, встроенные в ответ.
+
+    Число запросов не зависит от числа отзывов и комментариев: отзывы
+    с числом комментариев одним запросом, комментарии другим; число
+    отзывов берётся из Title.review_count.
+    """
+
+    limit = settings.INCLUDE_REVIEWS_LIMIT
+    with_comments = 'reviews.comments' in includes
+    # Порядок как у списка отзывов: с GROUP BY Meta.ordering не действует.
+    reviews = Review.objects.filter(title=title).select_related(
+        'author').order_by(*Review._meta.ordering)
+    if with_comments:
+        reviews = reviews.annotate(comment_count=Count('comments'))
+    reviews = list(reviews[:limit])
+    context = {'request': request}
+    results = ReviewSerializer(reviews, many=True, context=context).data
+    if with_comments:
+        comments_limit = settings.INCLUDE_COMMENTS_LIMIT
+        comments = get_comments(reviews, comments_limit)
+        for review, data in zip(reviews, results):
+            data['comments'] = embed(
+                CommentSerializer(comments[review.id], many=True,
+                                  context=context).data,
+                review.comment_count,
+                reverse('comments-list', request=request, kwargs={
+                    'title_id': title.id, 'review_id': review.id}),
+                comments_limit)
+    return embed(results, title.review_count, reverse(
+        'reviews-list', request=request, kwargs={'title_id': title.id}),
+        limit)
@@ -0,0 +1,121 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from api.authentication import RoleAccessToken
+from reviews.cache import invalidate_titles
+from reviews.models import Comment, Review, User
+
+ENDPOINTS = (
+    '/api/v1/categories/',
+    '/api/v1/genres/',
+    '/api/v1/titles/',
+    '/api/v1/titles/?year={year}',
+    '/api/v1/titles/?category={category}',
+    '/api/v1/titles/?genre={genre}',
+    '/api/v1/titles/?search={search}',
+    '/api/v1/titles/{title}/',
+    '/api/v1/titles/{title}/reviews/',
+    '/api/v1/titles/{title}/reviews/?cursor=',
+    '/api/v1/titles/{title}/reviews/{review}/',
+    '/api/v1/titles/{title}/reviews/{review}/comments/',
+    '/api/v1/titles/{title}/reviews/{review}/comments/?cursor=',
+    '/api/v1/users/',
+)
+# Полный проход: SCAN без ограничения по ключу, в том числе по индексу
+# (USING [COVERING] INDEX). Виртуальные таблицы FTS5 ищут по MATCH.
+TABLE_SCAN_RE = re.compile(
+    r'^SCAN (TABLE )?(?P<table>\w+)\b(?! VIRTUAL TABLE)')
+# Постраничные списки всей таблицы: COUNT и страница читают её целиком
+# намеренно. Их проходы выводятся предупреждением и не считаются.
+ALLOWED_SCANS = {
+    '/api/v1/categories/': {'reviews_category'},
+    '/api/v1/genres/': {'reviews_genre'},
+    '/api/v1/titles/': {'reviews_title'},
+    '/api/v1/users/': {'reviews_user'},
+}
+
+
+def get_url_params():
+    """Идентификаторы для URL из уже загруженных данных."""
+
+    comment = Comment.objects.select_related('review__title').first()
+    review = comment.review if comment else Review.objects.select_related(
+        'title').first()
+    if review is None:
+        raise CommandError(
+            'Нет отзывов. Загрузите данные: python manage.py import --all')
+    title = review.title
+    genre = title.genre.first()
+    return {
+        'title': title.id,
+        'review': review.id,
+        'year': title.year,
+        'category': title.category.slug if title.category else '',
+        'genre': genre.slug if genre else '',
+        'search': title.name.split()[0],
+    }
+
+
+class Command(BaseCommand):
+    help = """План выполнения каждого SQL-запроса эндпоинтов API.
+           python manage.py explain_queries [--fail-on-scan]
+           """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fail-on-scan', action='store_true',
+                            help='ошибка, если есть полный проход таблицы')
+
+    def explain(self, sql):
+        prefix = ('EXPLAIN QUERY PLAN' if connection.vendor == 'sqlite'
+                  else 'EXPLAIN')
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def report(self, queries, allowed):
+        """Планы SELECT-запросов; число неразрешённых полных проходов."""
+
+        scans = 0
+        for query in queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            self.stdout.write(f'  {sql}')
+            for line in self.explain(sql):
+                match = TABLE_SCAN_RE.match(line)
+                if match and match['table'] not in allowed:
+                    scans += 1
+                    self.stdout.write(self.style.ERROR(f'    {line}'))
+                elif match:
+                    self.stdout.write(self.style.WARNING(f'    {line}'))
+                else:
+                    self.stdout.write(f'    {line}')
+        return scans
+
+    def handle(self, *args, **options):
+        params = get_url_params()
+        headers = {}
+        admin = User.objects.filter(is_staff=True).first()
+        if admin:
+            headers['HTTP_AUTHORIZATION'] = (
+                f'Bearer {RoleAccessToken.for_user(admin)}')
+        client = Client()
+        scans = 0
+        for endpoint in ENDPOINTS:
+            url = endpoint.format(**params)
+            invalidate_titles()
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url, **headers)
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{url} -> {response.status_code}, '
+                f'запросов: {len(context.captured_queries)}'))
+            scans += self.report(context.captured_queries,
+                                 ALLOWED_SCANS.get(endpoint, ()))
+        if scans and options['fail_on_scan']:
+            raise CommandError(f'Полных проходов таблиц: {scans}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Полных проходов таблиц: {scans}'))
@@ -0,0 +1,76 @@
+import io
+import shutil
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api import profiling
+from reviews.models import User
+
+
+class Command(BaseCommand):
+    help = """Сохранённые профили запросов.
+           список: python manage.py profiles
+           дерево вызовов: python manage.py profiles <id> [--sort tottime]
+           файл pstats: python manage.py profiles <id> --output req.prof
+           ключ для ?profile=: python manage.py profiles --key <admin>
+           """
+
+    def add_arguments(self, parser):
+        parser.add_argument('id', nargs='?', help='id профиля')
+        parser.add_argument('-s', '--sort', default='cumulative',
+                            help='сортировка pstats, по умолчанию cumulative')
+        parser.add_argument('-l', '--limit', type=int, default=30,
+                            help='число строк статистики')
+        parser.add_argument('-o', '--output',
+                            help='скопировать файл pstats по этому пути')
+        parser.add_argument('-k', '--key', metavar='USERNAME',
+                            help='выдать администратору ключ для ?profile=')
+
+    def list_profiles(self):
+        profiles = profiling.list_profiles()
+        if not profiles:
+            self.stdout.write('Профилей нет.')
+            return
+        for meta in profiles:
+            created = datetime.fromtimestamp(meta['created'])
+            self.stdout.write(
+                f'{meta["id"]}  {created:%Y-%m-%d %H:%M:%S}  '
+                f'{meta["duration_ms"]:>9.2f} мс  {meta["status"]}  '
+                f'{meta["view"]}.{meta["action"]}  '
+                f'{meta["method"]} {meta["path"]}  ({meta["reason"]})')
+
+    def sign_key(self, username):
+        user = User.objects.filter(username=username, is_active=True).first()
+        if user is None or not user.is_admin:
+            raise CommandError(f'{username} не активный администратор.')
+        self.stdout.write(profiling.sign_profile_key(user))
+        self.stderr.write(
+            f'Ключ действует {settings.PROFILE_KEY_MAX_AGE} с.')
+
+    def copy_profile(self, profile_id, output):
+        shutil.copyfile(profiling.get_profile_path(profile_id), output)
+        self.stdout.write(f'Профиль записан в {output}.')
+
+    def print_profile(self, profile_id, sort, limit):
+        output = io.StringIO()
+        stats = profiling.load_stats(profile_id, stream=output)
+        stats.sort_stats(sort).print_stats(limit)
+        self.stdout.write(output.getvalue())
+
+    def handle(self, *args, **options):
+        if options['key']:
+            self.sign_key(options['key'])
+            return
+        if not options['id']:
+            self.list_profiles()
+            return
+        try:
+            if options['output']:
+                self.copy_profile(options['id'], options['output'])
+            else:
+                self.print_profile(options['id'], options['sort'],
+                                   options['limit'])
+        except LookupError as e:
+            raise CommandError(e)
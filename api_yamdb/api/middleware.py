@@ -0,0 +1,216 @@
+import cProfile
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+from reviews.metrics import metrics
+
+from .profiling import PROFILE_PARAM, get_profile_reason, save_profile
+
+logger = logging.getLogger('api.timing')
+
+_current = ContextVar('request_timing', default=None)
+
+
+class RequestTiming:
+    """Запросы к базе и время этапов обработки одного HTTP-запроса."""
+
+    def __init__(self, slow_query_ms):
+        self.slow_query_ms = slow_query_ms
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.slow_queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.queries += 1
+            self.db_time += duration
+            if duration * 1000 >= self.slow_query_ms:
+                self.slow_queries.append((sql, duration))
+
+
+@contextmanager
+def track_serializer():
+    """Время внутри блока добавляется к сериализации текущего запроса."""
+
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.serializer_time += time.perf_counter() - started
+
+
+def get_view_tag(request):
+    """Класс view и действие DRF, на которые разрешился URL."""
+
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None, None, None
+    view = getattr(match.func, 'cls', None)
+    actions = getattr(match.func, 'actions', None) or {}
+    return (match.view_name,
+            view.__name__ if view else match._func_path,
+            actions.get(request.method.lower()))
+
+
+class RequestTimingMiddleware:
+    """Число SQL-запросов, время базы, сериализации и всего запроса.
+
+    Результат уходит в заголовок Server-Timing и, если включён
+    REQUEST_TIMING_LOG, строкой JSON в лог api.timing. Заголовок видят
+    только администраторы, а при DEBUG все клиенты. Запросы к базе
+    дольше SLOW_QUERY_MS пишутся в лог вместе с SQL. Замеряется только
+    доля REQUEST_TIMING_SAMPLE_RATE запросов, остальные проходят без
+    обёрток.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.REQUEST_TIMING_SAMPLE_RATE:
+            return self.get_response(request)
+
+        timing = RequestTiming(settings.SLOW_QUERY_MS)
+        token = _current.set(timing)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timing))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - started
+
+        if self.shows_timing(request):
+            response['Server-Timing'] = self.get_header(timing, total)
+        self.log(request, response, timing, total)
+        return response
+
+    @staticmethod
+    def shows_timing(request):
+        # DRF кладёт пользователя из токена и в исходный HttpRequest.
+        user = getattr(request, 'user', None)
+        return settings.DEBUG or bool(
+            user and user.is_authenticated and user.is_admin)
+
+    @staticmethod
+    def get_header(timing, total):
+        return ', '.join((
+            f'db;dur={timing.db_time * 1000:.2f};'
+            f'desc="{timing.queries} queries"',
+            f'serializer;dur={timing.serializer_time * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ))
+
+    def log(self, request, response, timing, total):
+        route, view, action = get_view_tag(request)
+        for sql, duration in timing.slow_queries:
+            logger.warning('Медленный запрос %.2f мс в %s.%s: %s',
+                           duration * 1000, view, action, sql)
+        if settings.REQUEST_TIMING_LOG:
+            logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'route': route,
+                'view': view,
+                'action': action,
+                'queries': timing.queries,
+                'db_ms': round(timing.db_time * 1000, 2),
+                'serializer_ms': round(timing.serializer_time * 1000, 2),
+                'total_ms': round(total * 1000, 2),
+            }))
+
+
+def count_rows(response):
+    data = getattr(response, 'data', None)
+    if isinstance(data, dict):
+        data = data.get('results')
+    return len(data) if isinstance(data, list) else None
+
+
+class RequestMetricsMiddleware:
+    """Счётчики и гистограммы запросов для /metrics.
+
+    Метки: имя маршрута v1_router, метод и код ответа; для list
+    дополнительно число объектов в ответе.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        route, _, action = get_view_tag(request)
+        labels = {'route': route or 'unmatched', 'method': request.method,
+                  'status': str(response.status_code)}
+        metrics.inc('yamdb_http_requests_total', **labels)
+        metrics.observe('yamdb_http_request_duration_seconds', duration,
+                        **labels)
+        if action == 'list':
+            rows = count_rows(response)
+            if rows is not None:
+                metrics.observe('yamdb_list_rows', rows, route=route)
+        return response
+
+
+def get_safe_path(request):
+    """Путь запроса без ключа из ?profile=."""
+
+    query = request.GET.copy()
+    query.pop(PROFILE_PARAM, None)
+    return f'{request.path}?{query.urlencode()}' if query else request.path
+
+
+class ProfilingMiddleware:
+    """cProfile одного запроса по требованию администратора.
+
+    Профиль сохраняется в PROFILE_DIR, его id возвращается
+    в заголовке X-Profile-Id; смотреть: python manage.py profiles.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        reason = get_profile_reason(request)
+        if reason is None:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        response = profiler.runcall(self.get_response, request)
+        duration = time.perf_counter() - started
+
+        _, view, action = get_view_tag(request)
+        response['X-Profile-Id'] = save_profile(profiler, {
+            'created': time.time(),
+            'method': request.method,
+            'path': get_safe_path(request),
+            'view': view,
+            'action': action,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 2),
+            'reason': reason,
+        })
+        return response
@@ -1,8 +1,167 @@
+from functools import partial
+from hashlib import md5
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.functional import cached_property
+from django.utils.http import http_date
 from rest_framework import mixins, viewsets
+from rest_framework.exceptions import ValidationError
+
+from reviews.cache import get_or_compute, get_titles_key
+
+from .middleware import track_serializer
+
+
+class TimedSerializerMixin:
+    """Время to_representation сериализаторов view идёт в замер запроса."""
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        to_representation = serializer.to_representation
+
+        def timed(*args, **kwargs):
+            with track_serializer():
+                return to_representation(*args, **kwargs)
+
+        serializer.to_representation = timed
+        return serializer
+
+
+class ConditionalGetMixin:
+    """ETag и Last-Modified по версии данных, 304 без сериализации.
+
+    get_conditions возвращает версию и дату изменения данных или None,
+    если условный ответ невозможен. По умолчанию это число строк
+    и наибольший updated_at модели queryset; они кешируются до новой
+    версии каталога, как страницы произведений.
+    """
+
+    def get_conditions(self, request, *args, **kwargs):
+        model = self.queryset.model
+
+        def compute():
+            state = model.objects.aggregate(
+                count=Count('id'), last=Max('updated_at'))
+            last = state['last']
+            return (f'{state["count"]}:{last.timestamp() if last else 0}',
+                    last)
+
+        return get_or_compute(
+            get_titles_key(f'conditions:{model._meta.label}'), compute)
+
+    def conditional_response(self, method, request, *args, **kwargs):
+        return self.respond_conditionally(
+            request, self.get_conditions(request, *args, **kwargs),
+            partial(method, request, *args, **kwargs))
+
+    def respond_conditionally(self, request, conditions, get_response):
+        """304, если у клиента та же версия, иначе ответ get_response()."""
+
+        if conditions is None:
+            return get_response()
+        version, last_modified = conditions
+        # Один адрес в разных форматах (JSON, msgpack) - разные ETag.
+        etag = '"{}"'.format(md5(
+            f'{version}:{request.get_full_path()}:'
+            f'{request.accepted_renderer.format}'.encode()).hexdigest())
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = get_response()
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
+
+
+def get_relation_name(lookup):
+    return getattr(lookup, 'prefetch_through', lookup).split('__')[0]
+
+
+def trim_queryset(queryset, fields, columns=()):
+    """queryset только с колонками и связями полей fields.
+
+    Поля без колонки в модели (вычисляемые) не влияют на запрос.
+    """
+
+    opts = queryset.model._meta
+    columns = {opts.pk.name, *columns}
+    relations = set()
+    for name in fields:
+        try:
+            field = opts.get_field(name)
+        except FieldDoesNotExist:
+            continue
+        if field.is_relation:
+            relations.add(name)
+        if field.concrete and not field.many_to_many:
+            columns.add(name)
+    joined = queryset.query.select_related
+    joined = [name for name in joined if name in relations] if isinstance(
+        joined, dict) else []
+    prefetched = [lookup for lookup in queryset._prefetch_related_lookups
+                  if get_relation_name(lookup) in relations]
+    queryset = queryset.select_related(None).prefetch_related(None)
+    # select_related() без аргументов включил бы все связи.
+    if joined:
+        queryset = queryset.select_related(*joined)
+    return queryset.prefetch_related(*prefetched).only(*columns)
+
+
+class SparseFieldsViewMixin:
+    """?fields=id,name: в ответе list и retrieve только эти поля.
+
+    Незапрошенные поля не читаются из базы: queryset ограничивается
+    их колонками и связями. sparse_columns читаются всегда, например
+    ключ курсора пагинации.
+    """
+
+    fields_param = 'fields'
+    sparse_actions = ('list', 'retrieve')
+    sparse_columns = ()
+
+    @cached_property
+    def sparse_fields(self):
+        """Запрошенные поля в порядке сериализатора или None."""
+
+        raw = self.request.query_params.get(self.fields_param)
+        if self.action not in self.sparse_actions or not raw:
+            return None
+        requested = {name.strip() for name in raw.split(',')} - {''}
+        fields = self.get_serializer_class()().fields
+        available = [name for name, field in fields.items()
+                     if not field.write_only]
+        unknown = requested.difference(available)
+        if unknown:
+            raise ValidationError({self.fields_param: [
+                f'Неизвестные поля: {", ".join(sorted(unknown))}. '
+                f'Доступны: {", ".join(available)}.']})
+        return tuple(name for name in available if name in requested) or None
+
+    def trim_queryset(self, queryset):
+        """queryset под ?fields= без фильтров запроса."""
+
+        if self.sparse_fields is None:
+            return queryset
+        return trim_queryset(queryset, self.sparse_fields,
+                             self.sparse_columns)
+
+    def filter_queryset(self, queryset):
+        return self.trim_queryset(super().filter_queryset(queryset))
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.sparse_fields
+        return context
 
 
-class CDLViewSet(mixins.CreateModelMixin, mixins.DestroyModelMixin,
-                 mixins.ListModelMixin, viewsets.GenericViewSet):
+class CDLViewSet(TimedSerializerMixin, mixins.CreateModelMixin,
+                 mixins.DestroyModelMixin, mixins.ListModelMixin,
+                 viewsets.GenericViewSet):
     """Базовый viewset class.
     Поддерживаемые методы: Create, Destroy, List.
     """
@@ -0,0 +1,105 @@
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from urllib import parse
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorLimitOffsetPagination(LimitOffsetPagination):
+    """LimitOffset по умолчанию, keyset по (pub_date, id) при ?cursor=.
+
+    Курсор хранит ключ последнего (или первого) объекта страницы,
+    поэтому глубина листания не влияет на время запроса и COUNT(*)
+    не выполняется.
+    """
+
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+    keyset = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            return super().paginate_queryset(queryset, request, view)
+        self.keyset = True
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.base_url = remove_query_param(
+            request.build_absolute_uri(), self.offset_query_param)
+        reverse, position = self.decode_cursor(request)
+
+        if position is None:
+            queryset = queryset.order_by('-pub_date', '-id')
+        elif reverse:
+            pub_date, pk = position
+            queryset = queryset.filter(
+                Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, id__gt=pk)
+            ).order_by('pub_date', 'id')
+        else:
+            pub_date, pk = position
+            queryset = queryset.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk)
+            ).order_by('-pub_date', '-id')
+
+        results = list(queryset[:self.limit + 1])
+        has_more = len(results) > self.limit
+        results = results[:self.limit]
+        if reverse:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        self.page = results
+        return results
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return False, None
+        try:
+            query = parse.parse_qs(b64decode(encoded.encode()).decode())
+            reverse = query.get('r', ['0'])[0] == '1'
+            pub_date = parse_datetime(query['p'][0])
+            pk = int(query['i'][0])
+        except (TypeError, ValueError, KeyError, IndexError):
+            raise NotFound(self.invalid_cursor_message)
+        if pub_date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, (pub_date, pk)
+
+    def encode_cursor(self, item, reverse):
+        query = {'p': item.pub_date.isoformat(), 'i': item.id}
+        if reverse:
+            query['r'] = '1'
+        encoded = b64encode(parse.urlencode(query).encode()).decode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import permissions
 
 
@@ -17,6 +18,11 @@ class IsAdminOrReadOnly(permissions.BasePermission):
             return False
 
 
+class IsAdmin(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and request.user.is_admin
+
+
 class IsAdminOrModeratorOrAuthor(permissions.BasePermission):
     def has_permission(self, request, view):
         return (
@@ -26,6 +32,15 @@ class IsAdminOrModeratorOrAuthor(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj):
         return (request.method in permissions.SAFE_METHODS
-                or request.user == obj.author
+                or request.user.id == obj.author_id
                 or request.user.is_admin
                 or request.user.is_moderator)
+
+
+class IsMetricsScraper(permissions.BasePermission):
+    """Адрес из METRICS_ALLOWED_IPS или администратор."""
+
+    def has_permission(self, request, view):
+        return (request.META.get('REMOTE_ADDR')
+                in settings.METRICS_ALLOWED_IPS
+                or IsAdmin().has_permission(request, view))
@@ -0,0 +1,119 @@
+import json
+import os
+import pstats
+import random
+import time
+from glob import glob
+
+from django.conf import settings
+from django.core.signing import BadSignature, TimestampSigner
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from reviews.models import User
+
+from .authentication import StatelessJWTAuthentication
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_PARAM = 'profile'
+PROFILE_SALT = 'api.profiling'
+
+
+def is_admin_token(raw_token):
+    authentication = StatelessJWTAuthentication()
+    try:
+        user = authentication.get_user(
+            authentication.get_validated_token(raw_token))
+    except (AuthenticationFailed, InvalidToken, TokenError):
+        return False
+    return bool(getattr(user, 'is_admin', False))
+
+
+def sign_profile_key(user):
+    """Ключ для ?profile=: подписанный id администратора, не токен."""
+
+    return TimestampSigner(salt=PROFILE_SALT).sign(str(user.pk))
+
+
+def is_profile_key(value):
+    """Ключ не старше PROFILE_KEY_MAX_AGE выдан активному администратору."""
+
+    try:
+        user_id = TimestampSigner(salt=PROFILE_SALT).unsign(
+            value, max_age=settings.PROFILE_KEY_MAX_AGE)
+    except BadSignature:
+        return False
+    user = User.objects.filter(pk=user_id, is_active=True).first()
+    return bool(user and user.is_admin)
+
+
+def get_profile_reason(request):
+    """Почему запрос нужно профилировать, или None.
+
+    Заголовок X-Profile с токеном администратора в Authorization,
+    ?profile=<ключ из manage.py profiles --key> или случайная выборка
+    1 из PROFILE_SAMPLE_EVERY запросов. Токен доступа в URL
+    не принимается: он попал бы в логи и историю браузера.
+    """
+
+    if PROFILE_HEADER in request.META:
+        raw = StatelessJWTAuthentication().get_header(request)
+        parts = raw.split() if raw else []
+        if len(parts) == 2 and is_admin_token(parts[1]):
+            return 'header'
+    key = request.GET.get(PROFILE_PARAM)
+    if key and is_profile_key(key):
+        return 'param'
+    every = settings.PROFILE_SAMPLE_EVERY
+    if every and random.randrange(every) == 0:
+        return 'sample'
+    return None
+
+
+def save_profile(profiler, meta):
+    """Запись pstats и описания в кольцевой буфер PROFILE_DIR."""
+
+    directory = settings.PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    profile_id = f'{time.time_ns()}-{os.getpid()}'
+    profiler.dump_stats(os.path.join(directory, f'{profile_id}.prof'))
+    with open(os.path.join(directory, f'{profile_id}.json'), 'w') as file:
+        json.dump({'id': profile_id, **meta}, file)
+    prune_profiles(directory, settings.PROFILE_MAX_COUNT)
+    return profile_id
+
+
+def prune_profiles(directory, max_count):
+    paths = sorted(glob(os.path.join(directory, '*.json')),
+                   key=lambda path: int(os.path.basename(path).split('-')[0]))
+    for path in paths[:-max_count] if max_count else paths:
+        for stale in (path, path[:-len('.json')] + '.prof'):
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles():
+    """Описания сохранённых профилей, от старых к новым."""
+
+    profiles = []
+    for path in glob(os.path.join(settings.PROFILE_DIR, '*.json')):
+        try:
+            with open(path) as file:
+                profiles.append(json.load(file))
+        except (OSError, ValueError):
+            continue
+    return sorted(profiles, key=lambda meta: int(meta['id'].split('-')[0]))
+
+
+def get_profile_path(profile_id):
+    path = os.path.join(settings.PROFILE_DIR, f'{profile_id}.prof')
+    if os.path.basename(path) != f'{profile_id}.prof' or not os.path.exists(
+            path):
+        raise LookupError(f'Нет профиля {profile_id}')
+    return path
+
+
+def load_stats(profile_id, stream=None):
+    return pstats.Stats(get_profile_path(profile_id), stream=stream)
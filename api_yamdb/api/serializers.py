@@ -1,6 +1,11 @@
 from datetime import datetime
 
-from rest_framework import serializers, validators
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from django.utils.functional import cached_property
+from rest_framework import ISO_8601, serializers, validators
+from rest_framework.settings import api_settings
 
 from reviews.models import (User, Category, Genre, Title, Review, Comment,
                             get_censored)
@@ -10,6 +15,71 @@ MIN_SCORE = 1
 MAX_SCORE = 10
 
 
+def get_datetime_formatter(field):
+    """field.to_representation с форматом и часовым поясом, найденными раз.
+
+    Поле DRF ищет текущий часовой пояс для каждого значения; здесь он
+    берётся один раз на сериализатор. Необычные случаи уходят в поле.
+    """
+
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = getattr(field, 'timezone', field.default_timezone())
+    if (output_format is None or output_format.lower() != ISO_8601
+            or field_timezone is None):
+        return field.to_representation
+
+    def to_representation(value):
+        if not value or not timezone.is_aware(value):
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+    return to_representation
+
+
+def get_prefetched(instance, name):
+    """Объекты из prefetch_related без создания менеджера связи."""
+
+    cache = getattr(instance, '_prefetched_objects_cache', {})
+    if name in cache:
+        return cache[name]
+    return getattr(instance, name).all()
+
+
+class SparseFieldsMixin:
+    """Только поля из context['fields'] (?fields=), если он задан.
+
+    Значение поля даёт метод represent_<поле> или одноимённый атрибут
+    объекта, поэтому незапрошенные колонки и связи не читаются.
+    """
+
+    @cached_property
+    def sparse_fields(self):
+        return self.context.get('fields')
+
+    def to_sparse_representation(self, instance):
+        data = {}
+        for name in self.sparse_fields:
+            represent = getattr(self, f'represent_{name}', None)
+            data[name] = (getattr(instance, name) if represent is None
+                          else represent(instance))
+        return data
+
+
+class AuthorPubDateMixin(SparseFieldsMixin):
+    @cached_property
+    def format_pub_date(self):
+        return get_datetime_formatter(self.fields['pub_date'])
+
+    def represent_author(self, instance):
+        return instance.author.username
+
+    def represent_pub_date(self, instance):
+        return self.format_pub_date(instance.pub_date)
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -75,13 +145,10 @@ class GenreSerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
-class TitleViewSerializer(serializers.ModelSerializer):
+class TitleViewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     category = CategorySerializer()
     genre = GenreSerializer(many=True)
-    rating = serializers.SerializerMethodField()
-
-    def get_rating(self, obj):
-        return obj.get_rating()
+    rating = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Title
@@ -89,6 +156,37 @@ class TitleViewSerializer(serializers.ModelSerializer):
             'id', 'name', 'year', 'description', 'genre', 'category', 'rating'
         )
 
+    def to_representation(self, instance):
+        """Тот же результат, что у полей DRF, без их обхода на каждый объект.
+
+        При изменении полей нужно обновить и этот метод:
+        test_21_fast_serializers сравнивает его с обычным выводом DRF.
+        """
+
+        if self.sparse_fields is not None:
+            return self.to_sparse_representation(instance)
+        return {
+            'id': instance.id,
+            'name': instance.name,
+            'year': instance.year,
+            'description': instance.description,
+            'genre': self.represent_genre(instance),
+            'category': self.represent_category(instance),
+            'rating': self.represent_rating(instance),
+        }
+
+    def represent_genre(self, instance):
+        return [{'name': genre.name, 'slug': genre.slug}
+                for genre in get_prefetched(instance, 'genre')]
+
+    def represent_category(self, instance):
+        category = instance.category
+        return None if category is None else {
+            'name': category.name, 'slug': category.slug}
+
+    def represent_rating(self, instance):
+        return None if instance.rating is None else float(instance.rating)
+
 
 class TitleSerializer(serializers.ModelSerializer):
     category = serializers.SlugRelatedField(
@@ -118,7 +216,16 @@ class TitleUpdateSerializer(TitleSerializer):
         return data
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class TitleBatchSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(
+            min_value=1, max_value=models.BigIntegerField.MAX_BIGINT),
+        allow_empty=False,
+        max_length=settings.TITLES_BATCH_MAX_IDS,
+    )
+
+
+class ReviewSerializer(AuthorPubDateMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username', read_only=True
     )
@@ -128,10 +235,21 @@ class ReviewSerializer(serializers.ModelSerializer):
         read_only_fields = ('pub_date', 'id')
         model = Review
 
+    def to_representation(self, instance):
+        if self.sparse_fields is not None:
+            return self.to_sparse_representation(instance)
+        return {
+            'id': instance.id,
+            'author': self.represent_author(instance),
+            'text': instance.text,
+            'pub_date': self.represent_pub_date(instance),
+            'score': instance.score,
+        }
+
     def validate(self, attrs):
         author = self.context.get('request').user
         title = self.context.get('view').kwargs.get('title_id')
-        if (Review.objects.filter(author=author, title=title).exists()
+        if (Review.objects.filter(author=author.id, title=title).exists()
                 and self.context.get('request').method == 'POST'):
             raise serializers.ValidationError(
                 'Можно оставить только один отзыв на произведение'
@@ -150,7 +268,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         return text
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(AuthorPubDateMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username', read_only=True)
 
@@ -159,6 +277,16 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ('review', 'pub_date', 'id')
         model = Comment
 
+    def to_representation(self, instance):
+        if self.sparse_fields is not None:
+            return self.to_sparse_representation(instance)
+        return {
+            'id': instance.id,
+            'author': self.represent_author(instance),
+            'text': instance.text,
+            'pub_date': self.represent_pub_date(instance),
+        }
+
     def validate_text(self, text):
         get_censored(text)
         return text
@@ -1,9 +1,9 @@
-from django.urls import path, include
+from django.urls import path, re_path, include
 from rest_framework.routers import DefaultRouter
 
 from .views import (
     UserViewSet, SignUpView, GetTokenView, CategoryViewSet, GenreViewSet,
-    TitleViewSet, ReviewViewSet, CommentViewSet
+    TitleViewSet, ReviewViewSet, CommentViewSet, ExportView
 )
 
 v1_router = DefaultRouter()
@@ -23,5 +23,7 @@ v1_router.register(
 urlpatterns = [
     path('v1/auth/token/', GetTokenView.as_view(), name='token'),
     path('v1/auth/signup/', SignUpView.as_view(), name='signup'),
+    re_path(r'^v1/export/(?P<name>\w+)\.(?P<extension>csv|ndjson)$',
+            ExportView.as_view(), name='export'),
     path('v1/', include(v1_router.urls))
 ]
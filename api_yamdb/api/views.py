@@ -1,9 +1,11 @@
+from functools import partial
+
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
-from django.db import IntegrityError
-from django.http import Http404
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import HttpResponse, Http404, StreamingHttpResponse
 
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.views import APIView
@@ -12,22 +14,31 @@ from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework.filters import SearchFilter
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework.pagination import LimitOffsetPagination
 
 from .serializers import (
     UserSerializer, SignUpSerializer, TokenSerializer, CategorySerializer,
     GenreSerializer, TitleViewSerializer, TitleSerializer, ReviewSerializer,
-    CommentSerializer, TitleUpdateSerializer
+    CommentSerializer, TitleUpdateSerializer, TitleBatchSerializer
 )
-from .permissions import IsAdminOrModeratorOrAuthor, IsAdminOrReadOnly
-from .mixins import CDLViewSet
+from .permissions import (IsAdmin, IsAdminOrModeratorOrAuthor,
+                          IsAdminOrReadOnly, IsMetricsScraper)
+from .authentication import RoleAccessToken, get_user_instance
+from .middleware import track_serializer
+from .mixins import (CDLViewSet, ConditionalGetMixin, SparseFieldsViewMixin,
+                     TimedSerializerMixin)
+from .pagination import CursorLimitOffsetPagination
 from .filters import TitleFilter
+from .includes import include_reviews, parse_includes
+from reviews.datasets import (get_dataset_model, get_export_name,
+                              iter_export)
+from reviews.cache import get_or_compute, get_titles_key
+from reviews.metrics import render_metrics
 from reviews.models import User, Category, Genre, Title, Review, Comment
+from reviews.outbox import queue_email
 from api_yamdb.settings import ADMIN_EMAIL
 
 
-class UserViewSet(ModelViewSet):
+class UserViewSet(TimedSerializerMixin, ModelViewSet):
     http_method_names = ['get', 'post', 'patch', 'delete']
     queryset = User.objects.all().order_by('id')
     serializer_class = UserSerializer
@@ -39,7 +50,7 @@ class UserViewSet(ModelViewSet):
     @action(methods=['GET', 'PATCH'], detail=False,
             permission_classes=(IsAuthenticated,))
     def me(self, request):
-        user = self.request.user
+        user = get_user_instance(self.request.user)
         if request.method == 'GET':
             serializer = UserSerializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -50,34 +61,50 @@ class UserViewSet(ModelViewSet):
 
 
 def send_email(user):
+    """Письмо с кодом ставится в очередь, отправляет его run_outbox."""
+
     confirmation_code = default_token_generator.make_token(user)
     email_subject = 'Код для авторизации'
     email_text = f'Ваш код для авторизации - {confirmation_code}'
     admin_email = ADMIN_EMAIL
     user_email = [user.email]
-    return send_mail(email_subject, email_text, admin_email, user_email)
+    return queue_email(email_subject, email_text, admin_email, user_email)
 
 
 class SignUpView(APIView):
     permission_classes = (AllowAny,)
 
+    @staticmethod
+    def find_user(username, email):
+        """Пользователь с этой парой или ошибки конфликта за один запрос."""
+
+        error = {}
+        for user in User.objects.filter(
+                Q(username=username) | Q(email=email)):
+            if user.username == username and user.email == email:
+                return user, {}
+            if user.email == email:
+                error['email'] = 'Пользователь с такой почтой уже существует'
+            if user.username == username:
+                error['username'] = (
+                    'Пользователь с таким именем уже существует')
+        return None, error
+
     def post(self, request):
         serializer = SignUpSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         username = serializer.validated_data['username']
         email = serializer.validated_data['email']
-        try:
-            user, create = User.objects.get_or_create(
-                username=username,
-                email=email
-            )
-        except IntegrityError:
-            error = {}
-            if User.objects.filter(email=email).exists():
-                error['email'] = 'Пользователь с такой почтой уже существует'
-            if User.objects.filter(username=username).exists():
-                error['username'] = (
-                    'Пользователь с таким именем уже существует')
+        user, error = self.find_user(username, email)
+        if user is None and not error:
+            try:
+                with transaction.atomic():
+                    user = User.objects.create(
+                        username=username, email=email)
+            except IntegrityError:
+                # Параллельная регистрация успела занять имя или почту.
+                user, error = self.find_user(username, email)
+        if error:
             return Response(error,
                             status=status.HTTP_400_BAD_REQUEST)
         send_email(user)
@@ -99,14 +126,14 @@ class GetTokenView(APIView):
             return Response(
                 {'confirmation_code': 'Неверный код подтверждения'},
                 status=status.HTTP_400_BAD_REQUEST)
-        token = RefreshToken.for_user(user)
+        token = RoleAccessToken.for_user(user)
         return Response(
-            {'token': str(token.access_token)},
+            {'token': str(token)},
             status=status.HTTP_200_OK
         )
 
 
-class CategoryViewSet(CDLViewSet):
+class CategoryViewSet(ConditionalGetMixin, CDLViewSet):
     queryset = Category.objects.all().order_by('id')
     serializer_class = CategorySerializer
     permission_classes = (IsAdminOrReadOnly,)
@@ -114,8 +141,12 @@ class CategoryViewSet(CDLViewSet):
     search_fields = ('name', 'slug')
     lookup_field = 'slug'
 
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs)
+
 
-class GenreViewSet(CDLViewSet):
+class GenreViewSet(ConditionalGetMixin, CDLViewSet):
     queryset = Genre.objects.all().order_by('id')
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrReadOnly,)
@@ -123,15 +154,98 @@ class GenreViewSet(CDLViewSet):
     search_fields = ('name', 'slug')
     lookup_field = 'slug'
 
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs)
+
 
-class TitleViewSet(ModelViewSet):
-    queryset = Title.objects.all().order_by('id')
+class TitleViewSet(ConditionalGetMixin, SparseFieldsViewMixin,
+                   TimedSerializerMixin, ModelViewSet):
+    queryset = Title.objects.select_related('category').prefetch_related(
+        'genre').order_by('id')
+    # review_count - число встроенных отзывов для ?include=reviews.
+    sparse_columns = ('updated_at', 'review_count')
+    sparse_actions = ('list', 'retrieve', 'batch')
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
 
+    def cached_response(self, method, request, *args, **kwargs):
+        """Страница из кеша по полному URI запроса и версии каталога.
+
+        Вместе со страницей кешируется версия произведения для ETag,
+        поэтому повторный запрос, в том числе условный, не идёт в базу.
+        """
+
+        def compute():
+            response = method(request, *args, **kwargs)
+            return response.status_code, response.data, self.get_conditions(
+                request, *args, **kwargs)
+
+        status_code, data, conditions = get_or_compute(
+            get_titles_key(request.build_absolute_uri()), compute)
+        return self.respond_conditionally(
+            request, conditions, partial(Response, data, status=status_code))
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        includes = parse_includes(request)
+        if not includes:
+            return self.cached_response(
+                super().retrieve, request, *args, **kwargs)
+        # Комментарии не сбрасывают кеш и не меняют версию произведения,
+        # поэтому ответ со встроенными связями не кешируется и без ETag.
+        title = self.get_object()
+        data = self.get_serializer(title).data
+        data['reviews'] = include_reviews(request, title, includes)
+        return Response(data)
+
+    def get_object(self):
+        self.title = super().get_object()
+        return self.title
+
+    def get_conditions(self, request, *args, **kwargs):
+        """Версия загруженного произведения, его категории и жанров.
+
+        При ?fields= без категории или жанров они не загружены и в ответ
+        не входят, версия от них не зависит.
+        """
+
+        title = getattr(self, 'title', None)
+        if title is None:
+            return None
+        dates = [title.updated_at, *(
+            genre.updated_at for genre in getattr(
+                title, '_prefetched_objects_cache', {}).get('genre', ()))]
+        if Title.category.is_cached(title) and title.category is not None:
+            dates.append(title.category.updated_at)
+        version = ':'.join(str(date.timestamp()) for date in dates)
+        return version, max(dates)
+
+    @action(methods=['POST'], detail=False, permission_classes=(AllowAny,))
+    def batch(self, request):
+        """Произведения по списку id одним запросом, в порядке списка.
+
+        Повторы id схлопываются, id без произведения перечисляются
+        в missing и не дают ошибки. Параметры фильтрации списка
+        не применяются: иначе существующие произведения попали бы
+        в missing.
+        """
+
+        serializer = TitleBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data['ids']))
+        titles = self.trim_queryset(self.get_queryset()).in_bulk(ids)
+        return Response({
+            'results': self.get_serializer(
+                [titles[pk] for pk in ids if pk in titles], many=True).data,
+            'missing': [pk for pk in ids if pk not in titles],
+        })
+
     def get_serializer_class(self):
-        if self.action in ('retrieve', 'list'):
+        if self.action in ('retrieve', 'list', 'batch'):
             return TitleViewSerializer
         if self.action == 'partial_update':
             return TitleUpdateSerializer
@@ -147,37 +261,45 @@ class TitleViewSet(ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         instance = self.perform_create(serializer)
-        result = TitleViewSerializer(instance)
-        return Response(result.data, status=status.HTTP_201_CREATED)
+        with track_serializer():
+            data = TitleViewSerializer(instance).data
+        return Response(data, status=status.HTTP_201_CREATED)
 
     def update(self, request, *args, **kwargs):
         serializer = self.get_serializer(
             self.get_object(), data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         instance = self.perform_update(serializer)
-        result = TitleViewSerializer(instance)
-        return Response(result.data, status=status.HTTP_200_OK)
+        with track_serializer():
+            data = TitleViewSerializer(instance).data
+        return Response(data, status=status.HTTP_200_OK)
 
 
-class ReviewViewSet(ModelViewSet):
+class ReviewViewSet(SparseFieldsViewMixin, TimedSerializerMixin,
+                    ModelViewSet):
+    sparse_columns = ('pub_date',)
     serializer_class = ReviewSerializer
     permission_classes = (IsAdminOrModeratorOrAuthor,)
-    pagination_class = LimitOffsetPagination
+    pagination_class = CursorLimitOffsetPagination
 
     def get_title(self):
         return get_object_or_404(Title, id=self.kwargs.get('title_id'))
 
     def get_queryset(self):
-        return Review.objects.filter(title=self.get_title())
+        return Review.objects.filter(
+            title=self.get_title()).select_related('author')
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        serializer.save(author=get_user_instance(self.request.user),
+                        title=self.get_title())
 
 
-class CommentViewSet(ModelViewSet):
+class CommentViewSet(SparseFieldsViewMixin, TimedSerializerMixin,
+                     ModelViewSet):
+    sparse_columns = ('pub_date',)
     serializer_class = CommentSerializer
     permission_classes = (IsAdminOrModeratorOrAuthor,)
-    pagination_class = LimitOffsetPagination
+    pagination_class = CursorLimitOffsetPagination
 
     def get_title(self):
         return get_object_or_404(Title, id=self.kwargs.get('title_id'))
@@ -187,7 +309,46 @@ class CommentViewSet(ModelViewSet):
                                  title=self.get_title())
 
     def get_queryset(self):
-        return Comment.objects.filter(review=self.get_review())
+        return Comment.objects.filter(
+            review=self.get_review()).select_related('author')
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, review=self.get_review())
+        serializer.save(author=get_user_instance(self.request.user),
+                        review=self.get_review())
+
+
+class ExportView(APIView):
+    permission_classes = (IsAdmin,)
+    content_types = {
+        'csv': 'text/csv; charset=utf-8',
+        'ndjson': 'application/x-ndjson; charset=utf-8',
+    }
+
+    def perform_content_negotiation(self, request, force=False):
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, name, extension):
+        try:
+            model = get_dataset_model(name)
+        except LookupError:
+            raise Http404
+        response = StreamingHttpResponse(
+            iter_export(model, extension),
+            content_type=self.content_types[extension])
+        response['Content-Disposition'] = (
+            f'attachment; filename="{get_export_name(model, extension)}"')
+        return response
+
+
+class MetricsView(APIView):
+    """Метрики всех воркеров в текстовом формате Prometheus.
+
+    Доступны с адресов METRICS_ALLOWED_IPS и администратору: в них
+    видны трафик и время ответа каждого эндпоинта.
+    """
+
+    permission_classes = (IsMetricsScraper,)
+
+    def get(self, request):
+        return HttpResponse(render_metrics(),
+                            content_type='text/plain; version=0.0.4')
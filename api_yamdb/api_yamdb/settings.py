@@ -32,6 +32,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',
+    'api.middleware.RequestTimingMiddleware',
+    'api.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -110,6 +113,59 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
+# Для нескольких воркеров нужен общий бэкенд, например FileBasedCache.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+TITLES_CACHE_TIMEOUT = 60 * 5
+# Роль и активность пользователя для проверки токена; в других
+# воркерах с LocMemCache изменения видны не позже этого срока.
+USER_STATE_CACHE_TIMEOUT = 60
+
+# Сколько отзывов и комментариев к каждому из них встраивается
+# в произведение по ?include=reviews,reviews.comments.
+INCLUDE_REVIEWS_LIMIT = 10
+INCLUDE_COMMENTS_LIMIT = 3
+
+# Наибольшее число id в POST /api/v1/titles/batch/.
+TITLES_BATCH_MAX_IDS = 200
+
+# Доля замеряемых запросов, JSON-строка в лог и порог медленного SQL.
+# Заголовок Server-Timing получают только администраторы и DEBUG.
+REQUEST_TIMING_SAMPLE_RATE = 0.1
+REQUEST_TIMING_LOG = False
+SLOW_QUERY_MS = 100
+
+# Общий каталог для метрик нескольких воркеров; без него /metrics
+# показывает только текущий процесс. Каталог очищается при деплое.
+METRICS_DIR = None
+METRICS_FLUSH_INTERVAL = 1
+# Адреса сборщика метрик, с которых /metrics доступен без токена
+# администратора. За обратным прокси на той же машине REMOTE_ADDR
+# у всех запросов 127.0.0.1, поэтому по умолчанию список пуст.
+METRICS_ALLOWED_IPS = ()
+
+# Профили запросов: каталог, размер кольцевого буфера, случайная
+# выборка 1 из N запросов (0 - только по запросу администратора)
+# и срок ключа ?profile= в секундах.
+PROFILE_DIR = os.path.join(BASE_DIR, 'profiles')
+PROFILE_MAX_COUNT = 50
+PROFILE_SAMPLE_EVERY = 0
+PROFILE_KEY_MAX_AGE = 300
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.timing': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
@@ -118,7 +174,17 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny'
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'api.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_PAGINATION_CLASS': (
         'rest_framework.pagination.PageNumberPagination'
@@ -129,6 +195,7 @@ REST_FRAMEWORK = {
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_USER_CLASS': 'api.authentication.RoleTokenUser',
 }
 
 AUTH_USER_MODEL = 'reviews.User'
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Category, Genre, Title, User, Review, Comment
+from .models import (Category, Genre, Title, User, Review, Comment,
+                     OutboxEmail)
 
 
 class GenreinTitle(admin.TabularInline):
@@ -10,6 +11,7 @@ class GenreinTitle(admin.TabularInline):
 @admin.register(Title)
 class TitleAdmin(admin.ModelAdmin):
     inlines = (GenreinTitle,)
+    readonly_fields = ('score_sum', 'review_count', 'rating')
 
 
 admin.site.register(User)
@@ -17,3 +19,4 @@ admin.site.register(Category)
 admin.site.register(Genre)
 admin.site.register(Review)
 admin.site.register(Comment)
+admin.site.register(OutboxEmail)
@@ -0,0 +1,87 @@
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .metrics import metrics
+
+VERSION_KEY = 'titles:version'
+USER_STATE_KEY = 'users:state:{}'
+LOCK_TIMEOUT = 10
+POLL_INTERVAL = 0.05
+
+
+def get_titles_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = invalidate_titles()
+    return version
+
+
+def invalidate_titles(*args, **kwargs):
+    """Новая версия делает недоступными все закешированные страницы.
+
+    Версия берётся из часов, а не из счётчика, чтобы после вытеснения
+    ключа версии не совпасть со старыми записями.
+    """
+
+    version = time.time_ns()
+    cache.set(VERSION_KEY, version, None)
+    return version
+
+
+def invalidate_titles_on_commit(*args, **kwargs):
+    """invalidate_titles, когда изменения транзакции станут видны.
+
+    Иначе параллельный запрос успел бы закешировать под новой версией
+    данные до коммита, например рейтинг до Title.update_rating.
+    """
+
+    transaction.on_commit(invalidate_titles)
+
+
+def get_titles_key(uri):
+    digest = md5(uri.encode()).hexdigest()
+    return f'titles:{get_titles_version()}:{digest}'
+
+
+def get_or_compute(key, compute, timeout=None):
+    """Значение из кеша или compute(), пересчитываемое одним воркером.
+
+    Пока держатель блокировки считает значение, остальные ждут его
+    в кеше, а не запускают тот же запрос параллельно.
+    """
+
+    if timeout is None:
+        timeout = settings.TITLES_CACHE_TIMEOUT
+    value = cache.get(key)
+    if value is not None:
+        metrics.inc('yamdb_cache_requests_total', cache='titles', result='hit')
+        return value
+    metrics.inc('yamdb_cache_requests_total', cache='titles', result='miss')
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            value = compute()
+            cache.set(key, value, timeout)
+        finally:
+            cache.delete(lock_key)
+        return value
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+        if cache.get(lock_key) is None:
+            break
+    return compute()
+
+
+def forget_user(sender, instance, **kwargs):
+    """Сброс закешированных роли и активности пользователя после коммита."""
+
+    key = USER_STATE_KEY.format(instance.pk)
+    transaction.on_commit(lambda: cache.delete(key))
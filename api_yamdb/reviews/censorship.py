@@ -0,0 +1,99 @@
+import os
+from collections import deque
+from threading import Lock
+
+from django.conf import settings
+
+
+def get_censored_path():
+    return os.path.join(settings.BASE_DIR, 'static', 'data', 'censored.txt')
+
+
+class CensorMatcher:
+    """Автомат Ахо-Корасик по списку запрещённых слов.
+
+    Один проход по тексту находит все вхождения; search возвращает
+    слово, стоящее в списке раньше остальных найденных, как и прежний
+    построчный перебор файла.
+    """
+
+    def __init__(self, words):
+        self.words = [word for word in words if word]
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [None]
+        for index, word in enumerate(self.words):
+            self._add(word, index)
+        self._build()
+
+    def _add(self, word, index):
+        node = 0
+        for char in word:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(None)
+            node = next_node
+        if self._out[node] is None or index < self._out[node]:
+            self._out[node] = index
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                inherited = self._out[self._fail[child]]
+                if inherited is not None and (
+                        self._out[child] is None
+                        or inherited < self._out[child]):
+                    self._out[child] = inherited
+
+    def search(self, text):
+        """Первое по списку запрещённое слово в тексте или None."""
+
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        found = None
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            index = out[node]
+            if index is not None and (found is None or index < found):
+                found = index
+                if found == 0:
+                    break
+        return None if found is None else self.words[found]
+
+
+_matcher = None
+_matcher_mtime = None
+_matcher_lock = Lock()
+
+
+def get_matcher():
+    """Автомат, собранный один раз на процесс.
+
+    Пересобирается только при изменении mtime файла со словами.
+    """
+
+    global _matcher, _matcher_mtime
+    path = get_censored_path()
+    mtime = os.stat(path).st_mtime_ns
+    if _matcher is not None and _matcher_mtime == mtime:
+        return _matcher
+    with _matcher_lock:
+        if _matcher is None or _matcher_mtime != mtime:
+            with open(path, 'r', encoding='utf-8') as file:
+                words = [line.strip() for line in file]
+            _matcher = CensorMatcher(words)
+            _matcher_mtime = mtime
+    return _matcher
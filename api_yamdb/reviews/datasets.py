@@ -0,0 +1,105 @@
+import csv
+import json
+from contextlib import contextmanager
+from datetime import datetime
+
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+
+CHUNK_SIZE = 2000
+DATA_FILES = {
+    'Category': 'category.csv',
+    'Genre': 'genre.csv',
+    'Title': 'titles.csv',
+    'GenreTitle': 'genre_title.csv',
+    'User': 'users.csv',
+    'Review': 'review.csv',
+    'Comment': 'comments.csv',
+}
+EXPORT_FIELDS = {
+    'Category': ('id', 'name', 'slug'),
+    'Genre': ('id', 'name', 'slug'),
+    'Title': ('id', 'name', 'year', 'category', 'description', 'rating'),
+    'GenreTitle': ('id', 'title_id', 'genre_id'),
+    'User': ('id', 'username', 'email', 'role', 'bio', 'first_name',
+             'last_name'),
+    'Review': ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+    'Comment': ('id', 'review_id', 'text', 'author', 'pub_date'),
+}
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+
+def get_dataset_model(name):
+    """Модель по имени файла набора данных без расширения."""
+
+    for model_name, file in DATA_FILES.items():
+        if file.rsplit('.', 1)[0] == name:
+            return apps.get_model('reviews', model_name)
+    raise LookupError(f'Нет набора данных {name}')
+
+
+def get_export_name(model, export_format):
+    return DATA_FILES[model.__name__].rsplit('.', 1)[0] + '.' + export_format
+
+
+@contextmanager
+def keep_auto_dates(model, columns):
+    """Заданные даты не перезаписываются auto_now/auto_now_add."""
+
+    fields = [
+        field for field in model._meta.concrete_fields
+        if field.name in columns
+        and (getattr(field, 'auto_now', False)
+             or getattr(field, 'auto_now_add', False))
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def iter_rows(model):
+    """Строки модели через серверный курсор, в порядке id."""
+
+    return model.objects.order_by('id').values_list(
+        *EXPORT_FIELDS[model.__name__]).iterator(chunk_size=CHUNK_SIZE)
+
+
+class Echo:
+    """Буфер для csv.writer, возвращающий строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(model):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS[model.__name__])
+    for row in iter_rows(model):
+        yield writer.writerow([
+            '' if value is None
+            else value.isoformat() if isinstance(value, datetime)
+            else value
+            for value in row
+        ])
+
+
+def iter_ndjson(model):
+    fields = EXPORT_FIELDS[model.__name__]
+    for row in iter_rows(model):
+        yield json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder,
+                         ensure_ascii=False) + '\n'
+
+
+def iter_export(model, export_format):
+    """Построчная выгрузка модели в формате csv или ndjson."""
+
+    if export_format == 'csv':
+        return iter_csv(model)
+    if export_format == 'ndjson':
+        return iter_ndjson(model)
+    raise ValueError(f'Неизвестный формат {export_format}')
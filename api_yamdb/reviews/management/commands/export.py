@@ -0,0 +1,39 @@
+import os
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.datasets import (DATA_FILES, EXPORT_FORMATS, get_export_name,
+                              iter_export)
+
+
+class Command(BaseCommand):
+    help = """Выгрузка данных в файлы того же вида, что читает import.
+           python manage.py export --dir dump [--format ndjson]
+           """
+
+    def add_arguments(self, parser):
+        parser.add_argument('-d', '--dir', required=True,
+                            help='каталог для файлов, необходимо')
+        parser.add_argument('--format', choices=EXPORT_FORMATS,
+                            default='csv', help='формат файлов')
+        parser.add_argument('-m', '--model', action='append',
+                            choices=tuple(DATA_FILES),
+                            help='выгружаемые модели, по умолчанию все')
+
+    def handle(self, *args, **options):
+        os.makedirs(options['dir'], exist_ok=True)
+        for name in options['model'] or DATA_FILES:
+            model = apps.get_model('reviews', name)
+            path = os.path.join(
+                options['dir'], get_export_name(model, options['format']))
+            started = time.monotonic()
+            try:
+                with open(path, 'w', encoding='utf-8', newline='') as file:
+                    file.writelines(iter_export(model, options['format']))
+            except Exception as e:
+                raise CommandError(e)
+            self.stdout.write(
+                f'{name}: {path} за {time.monotonic() - started:.2f} с')
+        self.stdout.write(self.style.SUCCESS('Выгрузка завершена.'))
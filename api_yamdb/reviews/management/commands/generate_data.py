@@ -0,0 +1,207 @@
+import random
+import time
+from datetime import timedelta
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from reviews.cache import invalidate_titles
+from reviews.datasets import keep_auto_dates
+from reviews.models import (ADMIN, Category, Comment, Genre, GenreTitle,
+                            Review, Title, User)
+from reviews.ratings import rebuild_ratings
+
+BATCH_SIZE = 5000
+USER_PREFIX = 'bench_'
+ADMIN_USERNAME = 'bench_admin'
+DATE_SPAN = timedelta(days=365 * 3)
+SCALES = {
+    '10k': {'categories': 10, 'genres': 20, 'titles': 1000,
+            'users': 2000, 'reviews': 10_000, 'comments': 5_000},
+    '100k': {'categories': 20, 'genres': 50, 'titles': 5000,
+             'users': 10_000, 'reviews': 100_000, 'comments': 50_000},
+    '1m': {'categories': 30, 'genres': 100, 'titles': 20_000,
+           'users': 50_000, 'reviews': 1_000_000, 'comments': 500_000},
+}
+WORDS = (
+    'звезда', 'город', 'ночь', 'море', 'дорога', 'война', 'любовь', 'тайна',
+    'остров', 'зима', 'солнце', 'песня', 'герой', 'тень', 'ветер', 'дом',
+    'сердце', 'огонь', 'река', 'небо', 'время', 'сон', 'граница', 'берег',
+)
+
+
+def zipf_counts(total, size, exponent, cap):
+    """Раскладка total объектов по size позициям по закону Ципфа.
+
+    Ни одна позиция не получает больше cap; остаток от округления
+    и ограничения раздаётся по одному, начиная с первых позиций.
+    """
+
+    if total > size * cap:
+        raise CommandError(
+            f'Нельзя разместить {total} объектов по {size} позициям '
+            f'не больше {cap} на каждую.')
+    weights = [1 / rank ** exponent for rank in range(1, size + 1)]
+    norm = sum(weights)
+    counts = [min(cap, int(total * weight / norm)) for weight in weights]
+    rest = total - sum(counts)
+    while rest:
+        for index in range(size):
+            if not rest:
+                break
+            if counts[index] < cap:
+                counts[index] += 1
+                rest -= 1
+    return counts
+
+
+def make_text(rng, words):
+    return ' '.join(rng.choices(WORDS, k=words)).capitalize()
+
+
+def make_date(rng, now):
+    return now - DATE_SPAN * rng.random()
+
+
+def insert(model, objects, batch_size=BATCH_SIZE):
+    """bulk_create из генератора пачками, одна транзакция на пачку."""
+
+    total = 0
+    with keep_auto_dates(model, ('pub_date',)):
+        while True:
+            batch = list(islice(objects, batch_size))
+            if not batch:
+                return total
+            with transaction.atomic():
+                model.objects.bulk_create(batch, batch_size=batch_size)
+            total += len(batch)
+
+
+def clear():
+    """Удаление данных каталога одним DELETE на таблицу.
+
+    Без загрузки объектов и сигналов: пересчёт рейтинга после каждого
+    удалённого отзыва на миллионе строк занял бы часы.
+    """
+
+    with connection.cursor() as cursor:
+        for model in (Comment, Review, GenreTitle, Title, Genre, Category):
+            cursor.execute(
+                'DELETE FROM '
+                + connection.ops.quote_name(model._meta.db_table))
+    User.objects.filter(username__startswith=USER_PREFIX).delete()
+
+
+def generate_catalog(rng, sizes):
+    insert(Category, (
+        Category(name=f'Категория {index}', slug=f'category-{index}')
+        for index in range(sizes['categories'])))
+    insert(Genre, (
+        Genre(name=f'Жанр {index}', slug=f'genre-{index}')
+        for index in range(sizes['genres'])))
+    category_ids = list(Category.objects.values_list('id', flat=True))
+    insert(Title, (
+        Title(name=make_text(rng, rng.randint(1, 4)),
+              year=rng.randint(1950, 2022),
+              description=make_text(rng, 12),
+              category_id=rng.choice(category_ids))
+        for _ in range(sizes['titles'])))
+    genre_ids = list(Genre.objects.values_list('id', flat=True))
+    title_ids = list(Title.objects.values_list('id', flat=True))
+    insert(GenreTitle, (
+        GenreTitle(title_id=title_id, genre_id=genre_id)
+        for title_id in title_ids
+        for genre_id in rng.sample(genre_ids,
+                                   rng.randint(1, min(3, len(genre_ids))))))
+    return title_ids
+
+
+def generate_users(sizes):
+    User.objects.create(username=ADMIN_USERNAME,
+                        email=f'{ADMIN_USERNAME}@yamdb.fake', role=ADMIN)
+    insert(User, (
+        User(username=f'{USER_PREFIX}{index}',
+             email=f'{USER_PREFIX}{index}@yamdb.fake', password='!')
+        for index in range(sizes['users'])))
+    return list(User.objects.filter(username__startswith=USER_PREFIX).exclude(
+        username=ADMIN_USERNAME).values_list('id', flat=True))
+
+
+def generate_reviews(rng, title_ids, user_ids, total, exponent, now):
+    """Отзывы по произведениям по закону Ципфа, один на автора."""
+
+    title_ids = rng.sample(title_ids, len(title_ids))
+    counts = zipf_counts(total, len(title_ids), exponent, len(user_ids))
+    return insert(Review, (
+        Review(title_id=title_id, author_id=author_id,
+               score=rng.randint(1, 10), text=make_text(rng, 20),
+               pub_date=make_date(rng, now))
+        for title_id, count in zip(title_ids, counts)
+        for author_id in rng.sample(user_ids, count)))
+
+
+def generate_comments(rng, user_ids, total, exponent, now):
+    review_ids = list(Review.objects.values_list('id', flat=True))
+    review_ids = rng.sample(review_ids, len(review_ids))
+    counts = zipf_counts(total, len(review_ids), exponent, total)
+    return insert(Comment, (
+        Comment(review_id=review_id, author_id=rng.choice(user_ids),
+                text=make_text(rng, 10), pub_date=make_date(rng, now))
+        for review_id, count in zip(review_ids, counts)
+        for _ in range(count)))
+
+
+class Command(BaseCommand):
+    help = """Синтетические данные для бенчмарков.
+           готовый масштаб: python manage.py generate_data --scale 100k
+           свои размеры: python manage.py generate_data --titles 500
+               --users 1000 --reviews 20000 --comments 5000 --clear
+           """
+
+    def add_arguments(self, parser):
+        parser.add_argument('-s', '--scale', choices=SCALES, default='10k',
+                            help='набор размеров, по умолчанию 10k отзывов')
+        for name in SCALES['10k']:
+            parser.add_argument(f'--{name}', type=int,
+                                help=f'число объектов {name} вместо --scale')
+        parser.add_argument('--zipf', type=float, default=1.1,
+                            help='показатель закона Ципфа для отзывов '
+                                 'и комментариев')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='зерно генератора случайных чисел')
+        parser.add_argument('--clear', action='store_true',
+                            help='удалить произведения, отзывы и '
+                                 'пользователей прошлой генерации')
+
+    def step(self, label, started, count):
+        self.stdout.write(
+            f'{label:<12} {count:>10} {time.monotonic() - started:>8.2f} с')
+
+    def handle(self, *args, **options):
+        sizes = {name: options[name] if options[name] is not None else size
+                 for name, size in SCALES[options['scale']].items()}
+        if options['clear']:
+            clear()
+        elif Title.objects.exists() or User.objects.filter(
+                username=ADMIN_USERNAME).exists():
+            raise CommandError('В базе уже есть данные, добавьте --clear.')
+
+        rng = random.Random(options['seed'])
+        now = timezone.now()
+        started = time.monotonic()
+        title_ids = generate_catalog(rng, sizes)
+        self.step('Title', started, len(title_ids))
+        user_ids = generate_users(sizes)
+        self.step('User', started, len(user_ids))
+        count = generate_reviews(rng, title_ids, user_ids, sizes['reviews'],
+                                 options['zipf'], now)
+        self.step('Review', started, count)
+        count = generate_comments(rng, user_ids, sizes['comments'],
+                                  options['zipf'], now)
+        self.step('Comment', started, count)
+        rebuild_ratings(Title, Review)
+        invalidate_titles()
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные сгенерированы за {time.monotonic() - started:.2f} с.'))
@@ -1,65 +1,434 @@
 import os
 import csv
-import codecs
+import hashlib
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
 
 from django.apps import apps
 from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
 from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
 
+from reviews.cache import invalidate_titles
+from reviews.censorship import get_matcher
+from reviews.datasets import DATA_FILES, keep_auto_dates
+from reviews.models import ADMIN, ImportedFile, Review, Title, User
+from reviews.ratings import rebuild_ratings
 
-def get_field_value(model, field, value):
-    """Получение значение поля в зависимости от его типа."""
+BATCH_SIZE = 1000
+# Строк на запрос существующих записей: колонок ключа * LOOKUP_CHUNK
+# параметров, меньше лимита 999 старых версий SQLite.
+LOOKUP_CHUNK = 400
+CHUNK_SIZE = 1 << 20
+NATURAL_KEYS = {
+    'Category': ('slug',),
+    'Genre': ('slug',),
+    'User': ('username',),
+    'GenreTitle': ('title', 'genre'),
+    'Review': ('author', 'title'),
+}
+# Колонки, которые Review.save и Comment.save проверяют цензурой;
+# bulk_create и bulk_update этой проверки не делают.
+CENSORED_COLUMNS = {
+    'Review': 'text',
+    'Comment': 'text',
+}
 
-    field_object = model._meta.get_field(field)
-    if field_object.related_model:
-        return field_object.related_model.objects.get(pk=value)
-    if field_object.is_relation:
-        return int(value)
-    return value
 
+def get_data_dir():
+    return os.path.join(settings.STATICFILES_DIRS[0], 'data')
 
-def import_csv(model, file):
-    """Импорт файла."""
 
-    path = os.path.join(settings.STATICFILES_DIRS[0], 'data')
-    with codecs.open(f'{path}\\{file}', 'r', encoding='utf_8_sig') as data:
+def get_import_levels(models):
+    """Уровни загрузки по графу внешних ключей.
+
+    Модели одного уровня не ссылаются друг на друга и могут
+    загружаться одновременно.
+    """
+
+    pending = {
+        model: {
+            field.related_model for field in model._meta.concrete_fields
+            if field.is_relation and field.related_model in models
+            and field.related_model is not model
+        }
+        for model in models
+    }
+    levels = []
+    while pending:
+        level = [model for model, deps in pending.items() if not deps]
+        if not level:
+            raise CommandError(
+                'Циклическая зависимость: '
+                + ', '.join(model.__name__ for model in pending))
+        for model in level:
+            del pending[model]
+        for deps in pending.values():
+            deps.difference_update(level)
+        levels.append(level)
+    return levels
+
+
+ImportResult = namedtuple('ImportResult',
+                          'total created updated skipped censored')
+
+
+def get_converters(model, columns):
+    """Атрибут и конвертер для каждой колонки CSV.
+
+    Внешние ключи пишутся в attname (title_id, author_id) сырым id,
+    без запроса связанной записи.
+    """
+
+    converters = {}
+    for column in columns:
+        field = model._meta.get_field(column)
+
+        def convert(value, field=field):
+            if value == '' and field.null:
+                return None
+            return field.to_python(value)
+
+        converters[column] = (field.attname, convert)
+    return converters
+
+
+def get_checksum(path):
+    checksum = hashlib.sha256()
+    with open(path, 'rb') as data:
+        for chunk in iter(partial(data.read, CHUNK_SIZE), b''):
+            checksum.update(chunk)
+    return checksum.hexdigest()
+
+
+def get_upsert_key(model, columns):
+    """Поля, по которым строка CSV сопоставляется с записью в базе.
+
+    Первичный ключ, если он есть в файле, иначе естественный ключ
+    модели из NATURAL_KEYS.
+    """
+
+    names = {model._meta.get_field(column).name for column in columns}
+    if model._meta.pk.name in names:
+        return (model._meta.pk,)
+    natural_key = NATURAL_KEYS.get(model.__name__, ())
+    if natural_key and names.issuperset(natural_key):
+        return tuple(model._meta.get_field(name) for name in natural_key)
+    raise CommandError(
+        f'В файле для {model.__name__} нет ключа для сопоставления строк.')
+
+
+def read_batches(path, batch_size):
+    """Потоковое чтение CSV пачками по batch_size строк."""
+
+    with open(path, 'r', encoding='utf_8_sig', newline='') as data:
         csv_reader = csv.DictReader(data)
+        while True:
+            batch = list(islice(csv_reader, batch_size))
+            if not batch:
+                return
+            yield csv_reader.fieldnames, batch
+
+
+def find_censored(model, path, batch_size):
+    """Строки файла с запрещёнными словами: (номер, id, слово)."""
+
+    column = CENSORED_COLUMNS.get(model.__name__)
+    if column is None:
+        return []
+    matcher = get_matcher()
+    found = []
+    number = 0
+    for _, batch in read_batches(path, batch_size):
+        for number, row in enumerate(batch, start=number + 1):
+            word = matcher.search(row.get(column) or '')
+            if word is not None:
+                found.append((number, row.get('id'), word))
+    return found
+
+
+def format_censored(censored):
+    return ', '.join(
+        f'строка {number}' + (f' (id {pk})' if pk else '') + f' <{word}>'
+        for number, pk, word in censored)
+
+
+def check_censorship(model, path, batch_size, reject=False):
+    """Строки с запрещёнными словами; при reject файл отклоняется."""
+
+    censored = find_censored(model, path, batch_size)
+    if censored and reject:
+        raise CommandError(
+            f'{os.path.basename(path)}: запрещённые слова, '
+            f'{format_censored(censored)}.')
+    return censored
+
+
+def reset_sequences(model):
+    statements = connection.ops.sequence_reset_sql(no_style(), [model])
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+def build_items(model, batch, converters):
+    items = []
+    for row in batch:
         item = model()
-        for row in csv_reader:
-            for field, value in row.items():
-                item.__setattr__(field, get_field_value(item, field, value))
-            item.save()
+        for column, value in row.items():
+            attname, convert = converters[column]
+            setattr(item, attname, convert(value))
+        items.append(item)
+    return items
+
+
+def touch_auto_now(model, items, fields):
+    """Поля auto_now, которые bulk_update сам не обновляет."""
+
+    now = timezone.now()
+    touched = [field.attname for field in model._meta.concrete_fields
+               if getattr(field, 'auto_now', False)
+               and field.attname not in fields]
+    for item in items:
+        for attname in touched:
+            setattr(item, attname, now)
+    return touched
+
+
+def get_existing(model, items, key_attnames, key_of):
+    """Записи базы с ключами из items, по ключу.
+
+    Запрос на каждые LOOKUP_CHUNK строк фильтрует каждую колонку ключа
+    через __in, а составной ключ сверяется уже в Python: OR по строкам
+    упирался бы в лимиты SQLite на число параметров и глубину
+    выражения.
+    """
+
+    existing = {}
+    for start in range(0, len(items), LOOKUP_CHUNK):
+        chunk = items[start:start + LOOKUP_CHUNK]
+        keys = {key_of(item) for item in chunk}
+        lookup = {f'{attname}__in': {key[index] for key in keys}
+                  for index, attname in enumerate(key_attnames)}
+        for obj in model.objects.filter(**lookup):
+            if key_of(obj) in keys:
+                existing[key_of(obj)] = obj
+    return existing
+
+
+def upsert_batch(model, items, key, attnames, batch_size):
+    """Вставка новых и обновление изменившихся строк пачки."""
+
+    key_attnames = [field.attname for field in key]
+
+    def key_of(obj):
+        return tuple(getattr(obj, attname) for attname in key_attnames)
+
+    existing = get_existing(model, items, key_attnames, key_of)
+
+    created, updated = [], []
+    for item in items:
+        current = existing.get(key_of(item))
+        if current is None:
+            created.append(item)
+        elif any(getattr(current, attname) != getattr(item, attname)
+                 for attname in attnames):
+            item.pk = current.pk
+            updated.append(item)
+    if created:
+        model.objects.bulk_create(created, batch_size=batch_size)
+    fields = [attname for attname in attnames
+              if attname != model._meta.pk.attname]
+    if updated and fields:
+        fields += touch_auto_now(model, updated, fields)
+        model.objects.bulk_update(updated, fields, batch_size=batch_size)
+    return len(created), len(updated)
+
+
+def import_csv(model, path, batch_size=BATCH_SIZE, progress=None,
+               upsert=False, reject_censored=False):
+    """Импорт файла через bulk_create, одна транзакция на пачку.
+
+    В режиме upsert строки сопоставляются с записями в базе:
+    новые вставляются, изменившиеся обновляются, а файл с тем же
+    содержимым, что при прошлом импорте, пропускается целиком.
+    Строки с запрещёнными словами возвращаются в censored, а при
+    reject_censored файл целиком отклоняется до записи в базу.
+    """
+
+    checksum = get_checksum(path)
+    source = {'model': model._meta.label, 'file': os.path.basename(path)}
+    if upsert and ImportedFile.objects.filter(
+            checksum=checksum, **source).exists():
+        return ImportResult(0, 0, 0, True, [])
+    censored = check_censorship(model, path, batch_size, reject_censored)
+
+    total = created = updated = 0
+    started = time.monotonic()
+    converters = key = None
+    for columns, batch in read_batches(path, batch_size):
+        if converters is None:
+            converters = get_converters(model, columns)
+            attnames = [attname for attname, _ in converters.values()]
+            if upsert:
+                key = get_upsert_key(model, columns)
+        items = build_items(model, batch, converters)
+        with keep_auto_dates(model, columns), transaction.atomic():
+            if upsert:
+                batch_created, batch_updated = upsert_batch(
+                    model, items, key, attnames, batch_size)
+                created += batch_created
+                updated += batch_updated
+            else:
+                model.objects.bulk_create(items, batch_size=batch_size)
+                created += len(items)
+        total += len(items)
+        if progress:
+            progress(total, time.monotonic() - started)
+    reset_sequences(model)
+    if model is Review and (created or updated):
+        rebuild_ratings(Title, Review)
+    if model is User and (created or updated):
+        # bulk_create не вызывает User.save, выставляющий is_staff.
+        User.objects.filter(role=ADMIN).update(is_staff=True)
+    if created or updated:
+        invalidate_titles()
+    ImportedFile.objects.update_or_create(
+        defaults={'checksum': checksum}, **source)
+    return ImportResult(total, created, updated, False, censored)
+
+
+def import_model(model, path, batch_size, progress=None, upsert=False,
+                 reject_censored=False):
+    """Импорт одной модели в отдельном потоке со своим соединением."""
+
+    started = time.monotonic()
+    try:
+        result = import_csv(model, path, batch_size, progress, upsert,
+                            reject_censored)
+    finally:
+        connection.close()
+    return model.__name__, result, time.monotonic() - started
 
 
 class Command(BaseCommand):
     help = """Импорт данных из CSV файлов.
-           порядок загрузки:
+           весь набор данных в порядке зависимостей:
+           python manage.py import --all [--dir static/data]
+           одна модель:
            python manage.py import -a reviews -m Category -f category.csv
-           python manage.py import -a reviews -m Genre -f genre.csv
-           python manage.py import -a reviews -m Title -f titles.csv
-           python manage.py import -a reviews -m GenreTitle -f genre_title.csv
-           python manage.py import -a reviews -m User -f users.csv
-           python manage.py import -a reviews -m Review -f review.csv
-           python manage.py import -a reviews -m Comment -f comments.csv
+           повторный импорт только изменений:
+           python manage.py import --all --upsert
+           bulk_create не вызывает Review.save и Comment.save, поэтому
+           цензура текста проверяется здесь: строки с запрещёнными
+           словами загружаются и перечисляются в выводе, а с
+           --reject-censored файл с ними не загружается.
            """
 
     def add_arguments(self, parser):
-        parser.add_argument('-m', '--model', required=True,
-                            help='имя модели, необходимо')
-        parser.add_argument('-a', '--app', required=True,
-                            help='имя приложения, необходимо')
-        parser.add_argument('-f', '--file', required=True,
-                            help='имя файла для импорта, необходимо')
+        parser.add_argument('-m', '--model',
+                            help='имя модели')
+        parser.add_argument('-a', '--app',
+                            help='имя приложения')
+        parser.add_argument('-f', '--file',
+                            help='имя файла для импорта')
+        parser.add_argument('--all', action='store_true',
+                            help='импорт всех моделей reviews')
+        parser.add_argument('-d', '--dir', default=get_data_dir(),
+                            help='каталог с CSV файлами')
+        parser.add_argument('-b', '--batch-size', type=int,
+                            default=BATCH_SIZE,
+                            help=f'строк в пачке, по умолчанию {BATCH_SIZE}')
+        parser.add_argument('-u', '--upsert', action='store_true',
+                            help='вставлять новые и обновлять изменённые '
+                                 'строки, пропускать неизменённые файлы')
+        parser.add_argument('--reject-censored', action='store_true',
+                            help='не загружать файл, в котором есть '
+                                 'запрещённые слова')
+
+    def progress(self, total, elapsed, label=None):
+        rate = total / elapsed if elapsed else 0
+        prefix = f'{label}: ' if label else ''
+        self.stdout.write(f'{prefix}строк: {total}, {rate:.0f} строк/с')
+
+    def report_censored(self, name, censored):
+        if censored:
+            self.stdout.write(self.style.WARNING(
+                f'{name}: запрещённые слова, {format_censored(censored)}.'))
+
+    def import_all(self, directory, batch_size, upsert, reject_censored):
+        models = [apps.get_model('reviews', name) for name in DATA_FILES]
+        # SQLite допускает только одного писателя, там уровни идут подряд.
+        workers = 1 if connection.vendor == 'sqlite' else len(models)
+        summary = []
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for level in get_import_levels(models):
+                futures = [
+                    executor.submit(
+                        import_model, model,
+                        os.path.join(directory, DATA_FILES[model.__name__]),
+                        batch_size,
+                        partial(self.progress, label=model.__name__),
+                        upsert, reject_censored)
+                    for model in level
+                ]
+                summary.extend(future.result() for future in futures)
+        elapsed = time.monotonic() - started
+
+        self.stdout.write(f'{"модель":<12} {"строк":>10} {"новых":>8} '
+                          f'{"изменено":>8} {"секунд":>8} {"строк/с":>10}')
+        for name, result, seconds in summary:
+            if result.skipped:
+                self.stdout.write(f'{name:<12} файл не изменился')
+                continue
+            rate = result.total / seconds if seconds else 0
+            self.stdout.write(
+                f'{name:<12} {result.total:>10} {result.created:>8} '
+                f'{result.updated:>8} {seconds:>8.2f} {rate:>10.0f}')
+            self.report_censored(name, result.censored)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Обработано строк: '
+                f'{sum(result.total for _, result, _ in summary)} '
+                f'за {elapsed:.2f} с.'
+            )
+        )
 
     def handle(self, *args, **options):
+        if options['all']:
+            try:
+                self.import_all(options['dir'], options['batch_size'],
+                                options['upsert'], options['reject_censored'])
+            except Exception as e:
+                raise CommandError(e)
+            return
+        if not all(options[key] for key in ('app', 'model', 'file')):
+            raise CommandError('Укажите --all или -a, -m и -f.')
         try:
-            import_csv(apps.get_model(options['app'], options['model']),
-                       options['file'])
+            result = import_csv(
+                apps.get_model(options['app'], options['model']),
+                os.path.join(options['dir'], options['file']),
+                options['batch_size'], self.progress, options['upsert'],
+                options['reject_censored'])
         except Exception as e:
             raise CommandError(e)
 
+        if result.skipped:
+            self.stdout.write(
+                f'{options["file"]} не изменился с прошлого импорта.')
+            return
         self.stdout.write(
             self.style.SUCCESS(
-                f'{options["file"]} успешно импортирован в {options["model"]}.'
+                f'{options["file"]} успешно импортирован в {options["model"]}'
+                f' (строк: {result.total}, новых: {result.created}, '
+                f'изменено: {result.updated}).'
             )
         )
+        self.report_censored(options['model'], result.censored)
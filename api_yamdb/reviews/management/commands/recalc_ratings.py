@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from reviews.cache import invalidate_titles
+from reviews.models import Review, Title
+from reviews.ratings import rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = """Пересчёт рейтингов произведений по отзывам.
+           Нужен после массовой загрузки отзывов в обход Review.save.
+           """
+
+    def handle(self, *args, **options):
+        count = rebuild_ratings(Title, Review)
+        invalidate_titles()
+        self.stdout.write(
+            self.style.SUCCESS(f'Рейтинг пересчитан для {count} произведений.')
+        )
@@ -0,0 +1,44 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from reviews.outbox import MAX_ATTEMPTS, drain_outbox
+
+BATCH_SIZE = 100
+INTERVAL = 5
+
+
+class Command(BaseCommand):
+    help = """Отправка писем из очереди OutboxEmail.
+           python manage.py run_outbox [--once]
+           """
+
+    def add_arguments(self, parser):
+        parser.add_argument('-b', '--batch-size', type=int,
+                            default=BATCH_SIZE,
+                            help=f'писем в пачке, по умолчанию {BATCH_SIZE}')
+        parser.add_argument('-i', '--interval', type=float, default=INTERVAL,
+                            help='пауза при пустой очереди, секунд')
+        parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS,
+                            help='попыток отправки одного письма')
+        parser.add_argument('--once', action='store_true',
+                            help='отправить готовые письма и завершиться')
+
+    def handle(self, *args, **options):
+        connection = get_connection()
+        try:
+            while True:
+                sent, failed = drain_outbox(
+                    connection, options['batch_size'],
+                    options['max_attempts'])
+                if sent or failed:
+                    self.stdout.write(
+                        f'Отправлено: {sent}, ошибок: {failed}')
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
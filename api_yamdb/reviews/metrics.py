@@ -0,0 +1,208 @@
+import json
+import math
+import os
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from glob import glob
+from threading import Lock
+
+from django.conf import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+ROWS_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 1000)
+CENSORSHIP_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01)
+
+COUNTERS = {
+    'yamdb_http_requests_total': 'Число HTTP-запросов.',
+    'yamdb_cache_requests_total': 'Обращения к кешу по результату.',
+}
+HISTOGRAMS = {
+    'yamdb_http_request_duration_seconds': (
+        'Время обработки HTTP-запроса.', LATENCY_BUCKETS),
+    'yamdb_list_rows': (
+        'Число объектов в ответе list.', ROWS_BUCKETS),
+    'yamdb_censorship_check_seconds': (
+        'Время проверки текста на запрещённые слова.', CENSORSHIP_BUCKETS),
+}
+
+
+class Metrics:
+    """Счётчики и гистограммы одного процесса.
+
+    С METRICS_DIR каждый процесс раз в METRICS_FLUSH_INTERVAL секунд
+    сохраняет свои значения в файл <pid>.json, а render_metrics суммирует
+    файлы всех воркеров.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.flush_lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.counters = defaultdict(float)
+            self.histograms = {}
+            self.flushed = 0
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] += value
+        self.maybe_flush()
+
+    def observe(self, name, value, **labels):
+        buckets = HISTOGRAMS[name][1]
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            counts = self.histograms.get(key)
+            if counts is None:
+                counts = self.histograms[key] = [0] * (len(buckets) + 1)
+                counts.append(0.0)
+            counts[bisect_left(buckets, value)] += 1
+            counts[-1] += value
+        self.maybe_flush()
+
+    @contextmanager
+    def timer(self, name, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': [[name, labels, value] for (name, labels), value
+                             in self.counters.items()],
+                'histograms': [[name, labels, list(counts)]
+                               for (name, labels), counts
+                               in self.histograms.items()],
+            }
+
+    def maybe_flush(self):
+        directory = settings.METRICS_DIR
+        if not directory or (time.monotonic() - self.flushed
+                             < settings.METRICS_FLUSH_INTERVAL):
+            return
+        if self.flush_lock.acquire(blocking=False):
+            try:
+                self.flush(directory)
+            finally:
+                self.flush_lock.release()
+
+    def flush(self, directory):
+        self.flushed = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{os.getpid()}.json')
+        with open(path + '.tmp', 'w') as file:
+            json.dump(self.snapshot(), file)
+        os.replace(path + '.tmp', path)
+
+    def collect(self):
+        """Снимки всех воркеров, или только этого процесса без METRICS_DIR."""
+
+        directory = settings.METRICS_DIR
+        if not directory:
+            return [self.snapshot()]
+        with self.flush_lock:
+            self.flush(directory)
+        snapshots = []
+        for path in glob(os.path.join(directory, '*.json')):
+            try:
+                with open(path) as file:
+                    snapshots.append(json.load(file))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+
+metrics = Metrics()
+
+
+def merge(snapshots):
+    counters = defaultdict(float)
+    histograms = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            counters[name, tuple(map(tuple, labels))] += value
+        for name, labels, counts in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            if key not in histograms:
+                histograms[key] = list(counts)
+                continue
+            histograms[key] = [a + b for a, b in zip(histograms[key], counts)]
+    return counters, histograms
+
+
+def escape(value):
+    return (str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def format_value(value):
+    """Число без потери точности: формат :g оставлял 6 значащих цифр."""
+
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+def format_labels(labels, extra=()):
+    pairs = [f'{key}="{escape(value)}"' for key, value in (*labels, *extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def get_cache_ratios(counters):
+    totals = defaultdict(lambda: [0, 0])
+    for (name, labels), value in counters.items():
+        if name != 'yamdb_cache_requests_total':
+            continue
+        labels = dict(labels)
+        hits = totals[labels['cache']]
+        hits[1] += value
+        if labels['result'] == 'hit':
+            hits[0] += value
+    return {cache: hits / total for cache, (hits, total) in totals.items()}
+
+
+def render_metrics():
+    """Все метрики в текстовом формате Prometheus."""
+
+    counters, histograms = merge(metrics.collect())
+    lines = []
+    for name, help_text in COUNTERS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        lines += [f'{name}{format_labels(labels)} {format_value(value)}'
+                  for (metric, labels), value in sorted(counters.items())
+                  if metric == name]
+
+    lines += ['# HELP yamdb_cache_hit_ratio Доля попаданий в кеш.',
+              '# TYPE yamdb_cache_hit_ratio gauge']
+    lines += [f'yamdb_cache_hit_ratio{{cache="{cache}"}} '
+              f'{format_value(ratio)}'
+              for cache, ratio in sorted(get_cache_ratios(counters).items())]
+
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for (metric, labels), counts in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip((*buckets, '+Inf'), counts):
+                cumulative += count
+                lines.append(
+                    f'{name}_bucket{format_labels(labels, [("le", bound)])} '
+                    f'{format_value(cumulative)}')
+            lines.append(f'{name}_sum{format_labels(labels)} '
+                         f'{format_value(counts[-1])}')
+            lines.append(f'{name}_count{format_labels(labels)} '
+                         f'{format_value(cumulative)}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,36 @@
+# Generated by Django 3.2 on 2026-10-18 18:12
+
+from django.db import migrations, models
+
+from reviews.ratings import rebuild_ratings
+
+
+def fill_ratings(apps, schema_editor):
+    rebuild_ratings(apps.get_model('reviews', 'Title'),
+                    apps.get_model('reviews', 'Review'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Число отзывов'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.2 on 2026-10-18 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportedFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100, verbose_name='Модель')),
+                ('file', models.CharField(max_length=255, verbose_name='Файл')),
+                ('checksum', models.CharField(max_length=64, verbose_name='SHA-256 содержимого')),
+                ('imported_at', models.DateTimeField(auto_now=True, verbose_name='Дата импорта')),
+            ],
+            options={
+                'verbose_name': 'Импортированный файл',
+                'verbose_name_plural': 'Импортированные файлы',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='importedfile',
+            constraint=models.UniqueConstraint(fields=('model', 'file'), name='unique imported file'),
+        ),
+    ]
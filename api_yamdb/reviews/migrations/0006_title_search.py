@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from reviews.search import create_title_search, drop_title_search
+
+
+def forwards(apps, schema_editor):
+    create_title_search(schema_editor)
+
+
+def backwards(apps, schema_editor):
+    drop_title_search(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_outboxemail'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -2,21 +2,22 @@ from datetime import datetime
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
-from django.conf import settings
-
+from django.db import models, transaction
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .censorship import get_matcher
+from .metrics import metrics
+from .ratings import (rebuild_ratings, resume_title_updates,
+                      skip_title_updates)
 from .validators import validate_username
 
 
 def get_censored(text):
-    with open(
-            f'{settings.BASE_DIR}/static/data/censored.txt', 'r'
-    ) as file:
-        for word in file.readlines():
-            if word.strip() in text:
-                raise ValidationError(
-                    f'Цензура!!! Замените слово <{word.strip()}>'
-                )
+    with metrics.timer('yamdb_censorship_check_seconds'):
+        word = get_matcher().search(text)
+    if word is not None:
+        raise ValidationError(f'Цензура!!! Замените слово <{word}>')
 
 
 MAX_CHAR = 30
@@ -72,6 +73,7 @@ class Category(models.Model):
     name = models.CharField(
         'Наименование категории', max_length=256, unique=True)
     slug = models.SlugField('Slug категории', max_length=50, unique=True)
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
 
     class Meta:
         verbose_name = 'Категория'
@@ -86,6 +88,7 @@ class Genre(models.Model):
         'Наименование жанра', max_length=256, unique=True
     )
     slug = models.SlugField('Slug жанра', max_length=50, unique=True)
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
 
     class Meta:
         verbose_name = 'Жанр'
@@ -113,13 +116,36 @@ class Title(models.Model):
         blank=True, null=True, on_delete=models.SET_NULL)
     genre = models.ManyToManyField(
         Genre, through='GenreTitle', verbose_name='Жанры', blank=True)
-
-    def get_rating(self):
-        return self.reviews.aggregate(models.Avg('score'))['score__avg']
+    score_sum = models.PositiveIntegerField('Сумма оценок', default=0)
+    review_count = models.PositiveIntegerField('Число отзывов', default=0)
+    rating = models.FloatField('Рейтинг', blank=True, null=True)
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
+
+    @classmethod
+    def update_rating(cls, title_id, score_delta, count_delta):
+        """Сдвиг суммы и числа оценок одним UPDATE без агрегации."""
+
+        score_sum = models.F('score_sum') + score_delta
+        review_count = models.F('review_count') + count_delta
+        cls.objects.filter(pk=title_id).update(
+            updated_at=timezone.now(),
+            score_sum=score_sum,
+            review_count=review_count,
+            rating=models.Case(
+                models.When(review_count=-count_delta, then=None),
+                default=(Cast(score_sum, models.FloatField())
+                         / review_count),
+                output_field=models.FloatField(),
+            )
+        )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(fields=('year', 'id'), name='title_year'),
+            models.Index(fields=('category', 'id'), name='title_category'),
+        ]
 
     def __str__(self):
         return self.name
@@ -140,11 +166,35 @@ class GenreTitle(models.Model):
             fields=['title', 'genre'],
             name='unique_constraint_title_genre')
         ]
+        indexes = [models.Index(
+            fields=('genre', 'title'), name='genre_title_genre_first')
+        ]
 
     def __str__(self):
         return f'{self.genre} - {self.title}'
 
 
+class ReviewQuerySet(models.QuerySet):
+
+    def delete(self):
+        """Удаление с одним пересчётом рейтинга на произведение.
+
+        Без этого post_delete сдвигал бы рейтинг по каждому отзыву.
+        """
+
+        with transaction.atomic(using=self.db):
+            titles = set(self.values_list('title_id', flat=True))
+            skip_title_updates(titles)
+            try:
+                result = super().delete()
+            finally:
+                resume_title_updates(titles)
+            if titles:
+                rebuild_ratings(Title, self.model,
+                                titles=Title.objects.filter(pk__in=titles))
+        return result
+
+
 class Review(models.Model):
     author = models.ForeignKey(
         User, related_name='reviews', on_delete=models.CASCADE,
@@ -164,6 +214,8 @@ class Review(models.Model):
         ]
     )
 
+    objects = ReviewQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
@@ -172,13 +224,28 @@ class Review(models.Model):
             fields=('author', 'title'), name='unique review'
         )
         ]
+        indexes = [models.Index(
+            fields=('title', 'pub_date', 'id'), name='review_title_pub_date')
+        ]
 
     def clean_fields(self, exclude=('title', 'score', 'author', 'pub_date')):
         get_censored(self.text)
 
     def save(self, *args, **kwargs):
         self.clean_fields()
-        super(Review, self).save(*args, **kwargs)
+        with transaction.atomic():
+            previous = None
+            if self.pk is not None:
+                previous = Review.objects.filter(pk=self.pk).values_list(
+                    'title_id', 'score').first()
+            super(Review, self).save(*args, **kwargs)
+            if previous is None:
+                Title.update_rating(self.title_id, self.score, 1)
+            elif previous[0] != self.title_id:
+                Title.update_rating(previous[0], -previous[1], -1)
+                Title.update_rating(self.title_id, self.score, 1)
+            elif previous[1] != self.score:
+                Title.update_rating(self.title_id, self.score - previous[1], 0)
 
     def __str__(self):
         return self.text[:MAX_CHAR]
@@ -199,6 +266,10 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('-pub_date',)
+        indexes = [models.Index(
+            fields=('review', 'pub_date', 'id'),
+            name='comment_review_pub_date')
+        ]
 
     def clean_fields(self, exclude=('author', 'review', 'pub_date')):
         get_censored(self.text)
@@ -209,3 +280,44 @@ class Comment(models.Model):
 
     def __str__(self):
         return self.text[:MAX_CHAR]
+
+
+class ImportedFile(models.Model):
+    model = models.CharField('Модель', max_length=100)
+    file = models.CharField('Файл', max_length=255)
+    checksum = models.CharField('SHA-256 содержимого', max_length=64)
+    imported_at = models.DateTimeField('Дата импорта', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Импортированный файл'
+        verbose_name_plural = 'Импортированные файлы'
+        constraints = [models.UniqueConstraint(
+            fields=('model', 'file'), name='unique imported file'
+        )
+        ]
+
+    def __str__(self):
+        return f'{self.model} - {self.file}'
+
+
+class OutboxEmail(models.Model):
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.EmailField('Отправитель', max_length=254)
+    to = models.EmailField('Получатель', max_length=254)
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка', default=timezone.now)
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    sent_at = models.DateTimeField('Отправлено', blank=True, null=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        indexes = [models.Index(
+            fields=('sent_at', 'next_attempt_at'), name='outbox_pending')
+        ]
+
+    def __str__(self):
+        return f'{self.to} - {self.subject}'
@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from django.core.mail import EmailMessage
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 30
+# Пауза перед повтором письма, захваченного упавшим воркером.
+CLAIM_SECONDS = 300
+
+
+def queue_email(subject, body, from_email, recipients):
+    """Постановка письма в очередь вместо отправки в запросе."""
+
+    OutboxEmail.objects.bulk_create(
+        OutboxEmail(subject=subject, body=body, from_email=from_email, to=to)
+        for to in recipients
+    )
+
+
+def get_backoff(attempts):
+    return timedelta(seconds=BACKOFF_SECONDS * 2 ** (attempts - 1))
+
+
+def claim_outbox_batch(batch_size, max_attempts, now):
+    """Захват пачки писем короткой транзакцией.
+
+    Попытка засчитывается сразу, а следующая назначается через
+    CLAIM_SECONDS: другие воркеры письма не возьмут, а если воркер
+    упадёт, письмо отправится снова после этой паузы.
+    """
+
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True).filter(
+                sent_at__isnull=True, next_attempt_at__lte=now,
+                attempts__lt=max_attempts
+            ).order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        for email in emails:
+            email.attempts += 1
+            email.next_attempt_at = now + timedelta(seconds=CLAIM_SECONDS)
+        OutboxEmail.objects.bulk_update(
+            emails, ('attempts', 'next_attempt_at'))
+    return emails
+
+
+def send_outbox_batch(connection, batch_size, max_attempts=MAX_ATTEMPTS):
+    """Отправка пачки готовых к отправке писем через одно соединение.
+
+    SMTP не вызывается внутри транзакции, чтобы не держать блокировку
+    таблицы; результат каждого письма записывается сразу после его
+    отправки. Возвращает число отправленных и число неудачных попыток.
+    """
+
+    now = timezone.now()
+    sent = failed = 0
+    for email in claim_outbox_batch(batch_size, max_attempts, now):
+        message = EmailMessage(email.subject, email.body,
+                               email.from_email, [email.to],
+                               connection=connection)
+        try:
+            message.send()
+        except Exception as e:
+            # Соединение после ошибки может быть испорчено.
+            connection.close()
+            OutboxEmail.objects.filter(pk=email.pk).update(
+                last_error=str(e),
+                next_attempt_at=now + get_backoff(email.attempts))
+            failed += 1
+        else:
+            OutboxEmail.objects.filter(pk=email.pk).update(
+                sent_at=timezone.now(), last_error='')
+            sent += 1
+    return sent, failed
+
+
+def drain_outbox(connection, batch_size, max_attempts=MAX_ATTEMPTS):
+    """Отправка всех готовых писем, пока очередь не опустеет."""
+
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = send_outbox_batch(connection, batch_size, max_attempts)
+        total_sent += sent
+        total_failed += failed
+        if sent + failed < batch_size:
+            return total_sent, total_failed
@@ -0,0 +1,78 @@
+from contextvars import ContextVar
+
+from django.db import models
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+# Произведения, у которых удаление отзывов и связей с жанрами не
+# сдвигает рейтинг и updated_at: их удаляют целиком или пересчитывают
+# один раз после удаления.
+_skipped_titles = ContextVar('skipped_titles', default=frozenset())
+
+
+def skip_title_updates(title_ids):
+    _skipped_titles.set(_skipped_titles.get() | frozenset(title_ids))
+
+
+def resume_title_updates(title_ids):
+    _skipped_titles.set(_skipped_titles.get() - frozenset(title_ids))
+
+
+def is_title_update_skipped(title_id):
+    return title_id in _skipped_titles.get()
+
+
+# Удаляемые авторы и произведения с их отзывами: рейтинг пересчитывается
+# один раз после удаления автора, а не по каждому его отзыву.
+_deleted_authors = ContextVar('deleted_authors', default={})
+
+
+def defer_author_ratings(author_id):
+    _deleted_authors.set({**_deleted_authors.get(), author_id: set()})
+
+
+def defer_rating(author_id, title_id):
+    """Откладывает пересчёт, если автора отзыва сейчас удаляют."""
+
+    titles = _deleted_authors.get().get(author_id)
+    if titles is None:
+        return False
+    titles.add(title_id)
+    return True
+
+
+def pop_author_ratings(author_id):
+    authors = dict(_deleted_authors.get())
+    titles = authors.pop(author_id, set())
+    _deleted_authors.set(authors)
+    return titles
+
+
+def rebuild_ratings(title_model, review_model, titles=None):
+    """Пересчёт score_sum, review_count и rating с нуля.
+
+    Модели передаются явно, чтобы функцию можно было вызывать
+    и из миграций с историческими моделями.
+    """
+
+    reviews = review_model.objects.filter(
+        title=models.OuterRef('pk')).order_by().values('title')
+    score_sum = Coalesce(models.Subquery(
+        reviews.annotate(total=models.Sum('score')).values('total'),
+        output_field=models.IntegerField()), 0)
+    review_count = Coalesce(models.Subquery(
+        reviews.annotate(total=models.Count('pk')).values('total'),
+        output_field=models.IntegerField()), 0)
+    rating = models.Subquery(
+        reviews.annotate(
+            total=models.Avg(Cast('score', models.FloatField()))
+        ).values('total'),
+        output_field=models.FloatField())
+    fields = {'score_sum': score_sum, 'review_count': review_count,
+              'rating': rating}
+    # В исторических моделях ранних миграций updated_at ещё нет.
+    if any(field.name == 'updated_at' for field in title_model._meta.fields):
+        fields['updated_at'] = timezone.now()
+    if titles is None:
+        titles = title_model.objects.all()
+    return titles.update(**fields)
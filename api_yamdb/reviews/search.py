@@ -0,0 +1,98 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'reviews_title_fts'
+TRIGGERS_SQL = (
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai
+    AFTER INSERT ON reviews_title BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad
+    AFTER DELETE ON reviews_title BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF name, description ON reviews_title BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END""",
+)
+TOKEN_RE = re.compile(r'\w+')
+
+
+def create_title_search(schema_editor):
+    """FTS5-индекс по названию и описанию произведений (только SQLite)."""
+
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"name, description, content='reviews_title', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')"
+    )
+    for sql in TRIGGERS_SQL:
+        schema_editor.execute(sql)
+    schema_editor.execute(
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def drop_title_search(schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for suffix in ('ai', 'ad', 'au'):
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}')
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def ensure_title_search_triggers(using):
+    """Восстановление триггеров после пересоздания таблицы в миграциях.
+
+    SQLite-миграции копируют reviews_title в новую таблицу, и триггеры
+    старой таблицы при этом пропадают.
+    """
+
+    search_connection = connections[using]
+    if search_connection.vendor != 'sqlite':
+        return
+    with search_connection.cursor() as cursor:
+        tables = search_connection.introspection.table_names(cursor)
+        if FTS_TABLE not in tables or 'reviews_title' not in tables:
+            return
+        for sql in TRIGGERS_SQL:
+            cursor.execute(sql)
+
+
+def get_match_query(text):
+    """Запрос FTS5 с префиксным поиском по каждому слову."""
+
+    return ' '.join(f'"{token}"*' for token in TOKEN_RE.findall(text))
+
+
+def search_titles(queryset, text):
+    """Произведения по тексту, от наиболее релевантных (bm25)."""
+
+    if connections[queryset.db].vendor != 'sqlite':
+        return queryset.filter(
+            Q(name__icontains=text) | Q(description__icontains=text))
+    match = get_match_query(text)
+    if not match:
+        return queryset.none()
+    # Строки отбирает индекс FTS5, bm25 считается только для них.
+    matched = RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        (match,),
+    )
+    rank = RawSQL(
+        f'SELECT bm25({FTS_TABLE}) FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s AND rowid = reviews_title.id',
+        (match,),
+    )
+    return queryset.filter(id__in=matched).annotate(
+        search_rank=rank).order_by('search_rank', 'id')
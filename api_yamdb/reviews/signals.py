@@ -0,0 +1,102 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_migrate,
+                                      post_save, pre_delete)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import (forget_user, invalidate_titles,
+                    invalidate_titles_on_commit)
+from .models import Category, Genre, GenreTitle, Review, Title, User
+from .ratings import (defer_author_ratings, defer_rating,
+                      is_title_update_skipped, pop_author_ratings,
+                      rebuild_ratings, resume_title_updates,
+                      skip_title_updates)
+from .search import ensure_title_search_triggers
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """Вычитает оценку удалённого отзыва.
+
+    При удалении произведения рейтинг не нужен, при удалении автора
+    он пересчитывается один раз в user_deleted.
+    """
+
+    if is_title_update_skipped(instance.title_id) or defer_rating(
+            instance.author_id, instance.title_id):
+        return
+    Title.update_rating(instance.title_id, -instance.score, -1)
+
+
+@receiver(pre_delete, sender=Title)
+def title_deleting(sender, instance, **kwargs):
+    skip_title_updates([instance.pk])
+
+
+@receiver(post_delete, sender=Title)
+def title_deleted(sender, instance, **kwargs):
+    resume_title_updates([instance.pk])
+
+
+@receiver(pre_delete, sender=User)
+def user_deleting(sender, instance, **kwargs):
+    defer_author_ratings(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    titles = pop_author_ratings(instance.pk)
+    if titles:
+        rebuild_ratings(Title, Review,
+                        titles=Title.objects.filter(pk__in=titles))
+
+
+def touch_titles(ids):
+    """Новый updated_at произведений, у которых поменялись жанры."""
+
+    Title.objects.filter(pk__in=ids).update(updated_at=timezone.now())
+
+
+@receiver(pre_delete, sender=Category)
+def category_deleting(sender, instance, **kwargs):
+    # SET_NULL обнуляет category_id без updated_at, а от него зависят
+    # ETag и Last-Modified произведений.
+    touch_titles(Title.objects.filter(category=instance).values('pk'))
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def genre_title_changed(sender, instance, **kwargs):
+    if not is_title_update_skipped(instance.title_id):
+        touch_titles([instance.title_id])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if reverse and action == 'pre_clear':
+        touch_titles(Title.objects.filter(genre=instance).values('pk'))
+    elif action in ('post_add', 'post_remove'):
+        touch_titles(pk_set if reverse else [instance.pk])
+    elif action == 'post_clear' and not reverse:
+        touch_titles([instance.pk])
+
+
+for model in (Title, GenreTitle, Category, Genre, Review):
+    post_save.connect(invalidate_titles_on_commit, sender=model,
+                      dispatch_uid=f'invalidate_titles_save_{model.__name__}')
+    post_delete.connect(
+        invalidate_titles_on_commit, sender=model,
+        dispatch_uid=f'invalidate_titles_delete_{model.__name__}')
+m2m_changed.connect(invalidate_titles_on_commit, sender=Title.genre.through,
+                    dispatch_uid='invalidate_titles_genre')
+post_save.connect(forget_user, sender=User, dispatch_uid='forget_user_save')
+post_delete.connect(forget_user, sender=User,
+                    dispatch_uid='forget_user_delete')
+# flush и migrate меняют данные в обход сигналов моделей.
+post_migrate.connect(invalidate_titles, dispatch_uid='invalidate_titles')
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using, **kwargs):
+    if sender.name == 'reviews':
+        ensure_title_search_triggers(using)
@@ -0,0 +1,50 @@
+"""Сравнение построчного перебора censored.txt с автоматом Ахо-Корасик.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_censorship
+"""
+from benchmarks.utils import format_time, measure, setup_django
+
+SIZES = (('100 B', 100), ('10 KB', 10 * 1024), ('1 MB', 1024 * 1024))
+CLEAN_TEXT = (
+    'Фильм смотрится на одном дыхании, актёры играют убедительно, '
+    'музыка подобрана точно, а финал оставляет светлое послевкусие. '
+)
+
+
+def legacy_search(text):
+    """Прежняя реализация get_censored: чтение файла на каждый вызов."""
+
+    from reviews.censorship import get_censored_path
+    with open(get_censored_path(), 'r', encoding='utf-8') as file:
+        for word in file.readlines():
+            if word.strip() in text:
+                return word.strip()
+    return None
+
+
+def make_text(size):
+    """Текст без запрещённых слов: худший случай для обеих реализаций."""
+
+    return (CLEAN_TEXT * (size // len(CLEAN_TEXT) + 1))[:size]
+
+
+def main():
+    setup_django()
+    from reviews.censorship import get_matcher
+
+    matcher = get_matcher()
+    print(f'{"текст":>8} {"файл":>12} {"автомат":>12} {"ускорение":>10}')
+    for label, size in SIZES:
+        text = make_text(size)
+        assert legacy_search(text) == matcher.search(text)
+        number = 20 if size < 1024 * 1024 else 1
+        old = measure(legacy_search, text, repeat=3, number=number)
+        new = measure(lambda value: get_matcher().search(value), text,
+                      repeat=3, number=number)
+        print(f'{label:>8} {format_time(old):>12} {format_time(new):>12} '
+              f'{old / new:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
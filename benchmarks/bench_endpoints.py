@@ -0,0 +1,222 @@
+"""Задержка и пропускная способность эндпоинтов API на синтетических данных.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_endpoints --scale 10k 100k 1m
+    python -m benchmarks.bench_endpoints --compare old.json new.json
+
+Данные каждого масштаба генерируются командой generate_data в отдельную
+базу benchmarks/data/bench_<scale>.sqlite3 и переиспользуются при
+следующих запусках. Результаты пишутся в JSON для сравнения коммитов.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+
+from benchmarks.utils import BASE_DIR, setup_django
+
+DATA_DIR = os.path.join(BASE_DIR, 'benchmarks', 'data')
+RESULTS_DIR = os.path.join(BASE_DIR, 'benchmarks', 'results')
+POOL_SIZE = 500
+SCALE_NAMES = ('10k', '100k', '1m')
+ENDPOINTS = (
+    ('users-list', '/api/v1/users/?page={page}', True),
+    ('categories-list', '/api/v1/categories/', False),
+    ('genres-list', '/api/v1/genres/', False),
+    ('titles-list', '/api/v1/titles/?page={page}', False),
+    ('titles-genre', '/api/v1/titles/?genre={genre}', False),
+    ('titles-search', '/api/v1/titles/?search={word}', False),
+    ('titles-detail', '/api/v1/titles/{title}/', False),
+    ('reviews-list', '/api/v1/titles/{title}/reviews/', False),
+    ('reviews-cursor', '/api/v1/titles/{title}/reviews/?cursor=', False),
+    ('reviews-detail', '/api/v1/titles/{title}/reviews/{review}/', False),
+    ('comments-list',
+     '/api/v1/titles/{title}/reviews/{review}/comments/', False),
+    ('comments-detail',
+     '/api/v1/titles/{title}/reviews/{review}/comments/{comment}/', False),
+)
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', '--short', 'HEAD'), cwd=BASE_DIR,
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def use_database(scale):
+    """Отдельная база масштаба вместо рабочей, как у тестов с keepdb."""
+
+    from django.db import connection
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    connection.settings_dict['TEST']['NAME'] = os.path.join(
+        DATA_DIR, f'bench_{scale}.sqlite3')
+    return connection.creation.create_test_db(
+        verbosity=0, keepdb=True, serialize=False)
+
+
+def prepare_data(scale, seed):
+    from django.core.management import call_command
+    from reviews.management.commands.generate_data import SCALES
+    from reviews.models import Review
+
+    if Review.objects.count() != SCALES[scale]['reviews']:
+        call_command('generate_data', scale=scale, seed=seed, clear=True)
+
+
+def get_params(rng, count):
+    """Параметры URL: случайные цепочки произведение-отзыв-комментарий."""
+
+    from django.db.models import Max
+    from reviews.management.commands.generate_data import WORDS
+    from reviews.models import Comment, Genre
+
+    last_id = Comment.objects.aggregate(last=Max('id'))['last']
+    chains = list(Comment.objects.filter(
+        id__in=rng.sample(range(1, last_id + 1), min(POOL_SIZE, last_id))
+    ).values_list('review__title_id', 'review_id', 'id'))
+    genres = list(Genre.objects.values_list('slug', flat=True))
+    params = []
+    for _ in range(count):
+        title, review, comment = rng.choice(chains)
+        params.append({
+            'title': title, 'review': review, 'comment': comment,
+            'genre': rng.choice(genres), 'word': rng.choice(WORDS),
+            'page': rng.randint(1, 20),
+        })
+    return params
+
+
+def run_endpoint(client, url, params, warmup):
+    for item in params[:warmup]:
+        client.get(url.format(**item))
+    timings = []
+    started = time.perf_counter()
+    for item in params[warmup:]:
+        request_started = time.perf_counter()
+        response = client.get(url.format(**item))
+        timings.append(time.perf_counter() - request_started)
+        if response.status_code != 200:
+            raise RuntimeError(
+                f'{url.format(**item)}: ответ {response.status_code}')
+    elapsed = time.perf_counter() - started
+    percentiles = statistics.quantiles(timings, n=100)
+    return {
+        'requests': len(timings),
+        'mean_ms': round(statistics.mean(timings) * 1000, 3),
+        'p50_ms': round(percentiles[49] * 1000, 3),
+        'p90_ms': round(percentiles[89] * 1000, 3),
+        'p99_ms': round(percentiles[98] * 1000, 3),
+        'rps': round(len(timings) / elapsed, 1),
+    }
+
+
+def bench_scale(scale, options):
+    from django.db import connection
+    from django.test import Client
+    from api.authentication import RoleAccessToken
+    from reviews.management.commands.generate_data import (ADMIN_USERNAME,
+                                                           SCALES)
+    from reviews.models import User
+
+    old_name = use_database(scale)
+    try:
+        prepare_data(scale, options.seed)
+        admin = User.objects.get(username=ADMIN_USERNAME)
+        clients = (Client(), Client(HTTP_AUTHORIZATION=(
+            f'Bearer {RoleAccessToken.for_user(admin)}')))
+        params = get_params(random.Random(options.seed),
+                            options.warmup + options.requests)
+        endpoints = {}
+        for name, url, needs_admin in ENDPOINTS:
+            endpoints[name] = run_endpoint(
+                clients[needs_admin], url, params, options.warmup)
+            print(f'{scale:>5} {name:<16} {endpoints[name]["p50_ms"]:>9.2f} '
+                  f'{endpoints[name]["p90_ms"]:>9.2f} '
+                  f'{endpoints[name]["p99_ms"]:>9.2f} '
+                  f'{endpoints[name]["rps"]:>8.1f}')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0,
+                                            keepdb=True)
+    return {'sizes': SCALES[scale], 'endpoints': endpoints}
+
+
+def run(options):
+    setup_django()
+    from django.test.utils import override_settings, setup_test_environment
+
+    setup_test_environment(debug=False)
+    caches = {} if options.cache else {'CACHES': {'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}}
+    results = {
+        'commit': get_commit(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'cache': options.cache,
+        'requests': options.requests,
+        'scales': {},
+    }
+    print(f'{"":>5} {"эндпоинт":<16} {"p50, мс":>9} {"p90, мс":>9} '
+          f'{"p99, мс":>9} {"зап/с":>8}')
+    with override_settings(**caches):
+        for scale in options.scale:
+            results['scales'][scale] = bench_scale(scale, options)
+
+    output = options.output or os.path.join(
+        RESULTS_DIR, f'endpoints-{results["commit"] or "local"}-'
+                     f'{time.strftime("%Y%m%d-%H%M%S")}.json')
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, ensure_ascii=False, indent=2)
+    print(f'Результаты записаны в {output}')
+
+
+def compare(old_path, new_path):
+    """Изменение p50 и p99 между двумя запусками."""
+
+    with open(old_path, encoding='utf-8') as file:
+        old = json.load(file)
+    with open(new_path, encoding='utf-8') as file:
+        new = json.load(file)
+    print(f'{old["commit"]} -> {new["commit"]}')
+    print(f'{"":>5} {"эндпоинт":<16} {"p50":>8} {"p99":>8}')
+    for scale, result in new['scales'].items():
+        previous = old['scales'].get(scale, {}).get('endpoints', {})
+        for name, stats in result['endpoints'].items():
+            if name not in previous:
+                continue
+            print(f'{scale:>5} {name:<16} '
+                  f'{stats["p50_ms"] / previous[name]["p50_ms"]:>7.2f}x '
+                  f'{stats["p99_ms"] / previous[name]["p99_ms"]:>7.2f}x')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', nargs='+', choices=SCALE_NAMES,
+                        default=['10k'], help='масштабы данных')
+    parser.add_argument('--requests', type=int, default=200,
+                        help='замеряемых запросов на эндпоинт')
+    parser.add_argument('--warmup', type=int, default=20,
+                        help='запросов на прогрев')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cache', action='store_true',
+                        help='с кешем страниц произведений')
+    parser.add_argument('--output', help='файл JSON с результатами')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                        help='сравнить два файла результатов')
+    options = parser.parse_args()
+    if options.compare:
+        compare(*options.compare)
+    else:
+        run(options)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Кодирование страницы из 1000 отзывов: json, orjson и msgpack.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_renderers
+
+Отзывы берутся из базы масштаба 10k, как в bench_endpoints.
+"""
+from benchmarks.bench_endpoints import prepare_data, use_database
+from benchmarks.utils import format_time, measure, setup_django
+
+COUNT = 1000
+SCALE = '10k'
+
+
+def main():
+    setup_django()
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    from rest_framework.renderers import JSONRenderer
+    from api.renderers import MessagePackRenderer, ORJSONRenderer
+    from api.serializers import ReviewSerializer
+    from reviews.models import Review
+
+    setup_test_environment(debug=False)
+    old_name = use_database(SCALE)
+    try:
+        prepare_data(SCALE, seed=0)
+        reviews = Review.objects.select_related('author').order_by('id')
+        data = {
+            'count': reviews.count(),
+            'next': 'http://testserver/api/v1/titles/1/reviews/?limit=1000',
+            'previous': None,
+            'results': ReviewSerializer(reviews[:COUNT], many=True).data,
+        }
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0,
+                                            keepdb=True)
+
+    baseline = None
+    print(f'{"рендерер":<22} {"время":>12} {"размер, КБ":>11} '
+          f'{"ускорение":>10}')
+    for renderer in (JSONRenderer(), ORJSONRenderer(),
+                     MessagePackRenderer()):
+        elapsed = measure(renderer.render, data, repeat=5, number=20)
+        size = len(renderer.render(data)) / 1024
+        baseline = baseline or elapsed
+        print(f'{type(renderer).__name__:<22} {format_time(elapsed):>12} '
+              f'{size:>11.1f} {baseline / elapsed:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
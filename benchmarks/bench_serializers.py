@@ -0,0 +1,60 @@
+"""Сериализация 1000 объектов: поля DRF против ручного to_representation.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_serializers
+
+Объекты берутся из базы масштаба 10k, как в bench_endpoints.
+"""
+from benchmarks.bench_endpoints import prepare_data, use_database
+from benchmarks.utils import format_time, measure, setup_django
+
+COUNT = 1000
+SCALE = '10k'
+
+
+def main():
+    setup_django()
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    from rest_framework import serializers
+    from api.serializers import (CommentSerializer, ReviewSerializer,
+                                 TitleViewSerializer)
+    from reviews.models import Comment, Review, Title
+
+    setup_test_environment(debug=False)
+    old_name = use_database(SCALE)
+    try:
+        prepare_data(SCALE, seed=0)
+        cases = (
+            (TitleViewSerializer, Title.objects.select_related(
+                'category').prefetch_related('genre').order_by('id')),
+            (ReviewSerializer,
+             Review.objects.select_related('author').order_by('id')),
+            (CommentSerializer,
+             Comment.objects.select_related('author').order_by('id')),
+        )
+        print(f'{"сериализатор":<22} {"поля DRF":>12} {"вручную":>12} '
+              f'{"ускорение":>10}')
+        for serializer_class, queryset in cases:
+            objects = list(queryset[:COUNT])
+            child = serializer_class(objects, many=True).child
+
+            def generic():
+                return [serializers.ModelSerializer.to_representation(
+                    child, item) for item in objects]
+
+            def fast():
+                return serializer_class(objects, many=True).data
+
+            assert generic() == fast()
+            old = measure(generic, repeat=5)
+            new = measure(fast, repeat=5)
+            print(f'{serializer_class.__name__:<22} {format_time(old):>12} '
+                  f'{format_time(new):>12} {old / new:>9.1f}x')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0,
+                                            keepdb=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANAGE_PATH = os.path.join(BASE_DIR, 'api_yamdb')
+
+
+def setup_django():
+    """Настройка Django для запуска бенчмарков вне manage.py."""
+
+    if MANAGE_PATH not in sys.path:
+        sys.path.insert(0, MANAGE_PATH)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    import django
+    django.setup()
+
+
+def measure(func, *args, repeat=5, number=1):
+    """Лучшее время одного вызова func из repeat серий по number вызовов."""
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func(*args)
+        elapsed = (time.perf_counter() - start) / number
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def format_time(seconds):
+    if seconds < 1e-3:
+        return f'{seconds * 1e6:.1f} мкс'
+    if seconds < 1:
+        return f'{seconds * 1e3:.2f} мс'
+    return f'{seconds:.2f} с'
@@ -1,6 +1,8 @@
 import os
 import sys
 
+import pytest
+
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -32,4 +34,16 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 
 pytest_plugins = [
     'tests.fixtures.fixture_user',
+    'tests.fixtures.fixture_title',
 ]
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix):
+    # Тестовая SQLite в файле: в общей памяти параллельные запросы
+    # получают "table is locked" вместо ожидания блокировки.
+    from django.conf import settings
+    database = settings.DATABASES['default']
+    if database['ENGINE'] == 'django.db.backends.sqlite3':
+        database.setdefault('TEST', {})['NAME'] = os.path.join(
+            MANAGE_PATH, 'test_db.sqlite3')
@@ -0,0 +1,26 @@
+import pytest
+
+from reviews.models import Category, Genre, Title, User
+
+
+@pytest.fixture
+def category():
+    return Category.objects.create(name='Фильм', slug='films')
+
+
+@pytest.fixture
+def genre():
+    return Genre.objects.create(name='Драма', slug='drama')
+
+
+@pytest.fixture
+def title(category, genre):
+    title = Title.objects.create(name='Терминатор', year=1984,
+                                 category=category)
+    title.genre.set([genre])
+    return title
+
+
+@pytest.fixture
+def author():
+    return User.objects.create(username='author', email='author@yamdb.fake')
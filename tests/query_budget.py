@@ -0,0 +1,102 @@
+from contextlib import contextmanager
+from functools import wraps
+from urllib.parse import urlsplit
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+# Наибольшее число SQL-запросов для каждого маршрута v1_router
+# и действия viewset при запросе с токеном, в котором есть роль.
+# list, retrieve и destroy не должны зависеть от числа строк; list
+# категорий и жанров без кеша считает версию для ETag; удаление
+# пользователя один раз пересчитывает рейтинг его произведений, удаление
+# категории одним UPDATE сдвигает updated_at её произведений.
+QUERY_BUDGETS = {
+    'users': {
+        'list': 2, 'retrieve': 1, 'create': 3, 'partial_update': 2,
+        'destroy': 11, 'me': 2,
+    },
+    'category': {'list': 3, 'create': 3, 'destroy': 6},
+    'genre': {'list': 3, 'create': 3, 'destroy': 6},
+    'titles': {
+        'list': 3, 'retrieve': 2, 'create': 10, 'partial_update': 11,
+        'destroy': 9, 'batch': 2,
+    },
+    'reviews': {
+        'list': 3, 'retrieve': 2, 'create': 6, 'partial_update': 6,
+        'destroy': 6,
+    },
+    'comments': {
+        'list': 4, 'retrieve': 3, 'create': 4, 'partial_update': 4,
+        'destroy': 4,
+    },
+}
+
+
+def get_budget(route, action):
+    try:
+        return QUERY_BUDGETS[route][action]
+    except KeyError:
+        raise AssertionError(
+            f'Нет бюджета запросов для `{route}.{action}`: добавьте его '
+            'в QUERY_BUDGETS в tests/query_budget.py.'
+        )
+
+
+def format_queries(queries):
+    return '\n'.join(
+        f'{number}. {query["sql"]}'
+        for number, query in enumerate(queries, start=1)
+    )
+
+
+@contextmanager
+def assert_query_budget(route, action, using=None):
+    """Проверка, что блок укладывается в бюджет route.action.
+
+    При превышении ошибка содержит все выполненные SQL-запросы.
+    """
+
+    budget = get_budget(route, action)
+    context = CaptureQueriesContext(
+        connection if using is None else using)
+    with context:
+        yield context
+    count = len(context.captured_queries)
+    assert count <= budget, (
+        f'`{route}.{action}` выполнил {count} SQL-запросов при бюджете '
+        f'{budget}:\n{format_queries(context.captured_queries)}'
+    )
+
+
+def query_budget(route, action):
+    """Декоратор теста: всё тело теста должно уложиться в бюджет."""
+
+    def decorator(test):
+        @wraps(test)
+        def wrapper(*args, **kwargs):
+            with assert_query_budget(route, action):
+                return test(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_route_action(method, url):
+    """Маршрут v1_router и действие viewset, на которые попадёт запрос."""
+
+    match = resolve(urlsplit(url).path)
+    route = match.url_name.rsplit('-', 1)[0]
+    actions = getattr(match.func, 'actions', None) or {}
+    action = actions.get(method.lower())
+    if action is None:
+        raise AssertionError(f'`{method} {url}` не ведёт в действие viewset.')
+    return route, action
+
+
+def request_within_budget(client, method, url, **kwargs):
+    """Запрос клиентом с проверкой бюджета его маршрута и действия."""
+
+    route, action = get_route_action(method, url)
+    with assert_query_budget(route, action):
+        return getattr(client, method.lower())(url, **kwargs)
@@ -0,0 +1,54 @@
+import pytest
+from rest_framework.pagination import PageNumberPagination
+
+from reviews.models import Category, Genre, GenreTitle, Title
+
+
+def create_catalog(size):
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name='Ужасы', slug='horror'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {idx}', year=2000, category=category)
+        for idx in range(size)
+    )
+    titles = list(Title.objects.all())
+    GenreTitle.objects.bulk_create(
+        GenreTitle(title=title, genre=genre)
+        for title in titles for genre in genres
+    )
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleQueries:
+
+    @pytest.mark.parametrize('page_size', (10, 100, 1000))
+    def test_01_list_queries(self, client, monkeypatch,
+                             django_assert_num_queries, page_size):
+        create_catalog(page_size)
+        monkeypatch.setattr(PageNumberPagination, 'page_size', page_size)
+        # COUNT, произведения с категорией, жанры одним prefetch.
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/')
+        results = response.json()['results']
+        assert len(results) == page_size, (
+            'Проверьте, что GET-запрос к `/api/v1/titles/` возвращает '
+            'полную страницу произведений.'
+        )
+        assert all(len(title['genre']) == 2 for title in results), (
+            'Проверьте, что в ответе на GET-запрос к `/api/v1/titles/` '
+            'для каждого произведения возвращаются все жанры.'
+        )
+
+    def test_02_detail_queries(self, client, django_assert_num_queries):
+        titles = create_catalog(1)
+        with django_assert_num_queries(2):
+            response = client.get(f'/api/v1/titles/{titles[0].id}/')
+        data = response.json()
+        assert data['category'] == {'name': 'Фильм', 'slug': 'films'}, (
+            'Проверьте, что GET-запрос к `/api/v1/titles/{title_id}/` '
+            'возвращает категорию произведения.'
+        )
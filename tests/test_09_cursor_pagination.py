@@ -0,0 +1,58 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Review, Title, User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09CursorPagination:
+
+    def test_01_reviews_cursor(self, client):
+        title = Title.objects.create(name='Терминатор', year=1984)
+        for idx in range(25):
+            author = User.objects.create(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake')
+            Review.objects.create(
+                author=author, title=title, text=f'review {idx}', score=5)
+        expected = list(
+            Review.objects.filter(title=title)
+            .order_by('-pub_date', '-id').values_list('id', flat=True)
+        )
+        url = f'/api/v1/titles/{title.id}/reviews/?cursor=&limit=10'
+
+        pages = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что GET-запрос к '
+                '`/api/v1/titles/{title_id}/reviews/?cursor=` возвращает '
+                'ответ со статусом 200.'
+            )
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что в режиме курсора не выполняется подсчёт '
+                'общего числа отзывов.'
+            )
+            pages.append(data)
+            url = data['next']
+        assert [review['id'] for page in pages
+                for review in page['results']] == expected, (
+            'Проверьте, что листание по курсору возвращает все отзывы '
+            'по одному разу в порядке убывания даты публикации.'
+        )
+
+        response = client.get(pages[-1]['previous'])
+        assert response.json()['results'] == pages[-2]['results'], (
+            'Проверьте, что ссылка `previous` в режиме курсора '
+            'возвращает предыдущую страницу.'
+        )
+
+    def test_02_invalid_cursor(self, client):
+        title = Title.objects.create(name='Терминатор', year=1984)
+        response = client.get(
+            f'/api/v1/titles/{title.id}/reviews/?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что при неверном курсоре возвращается ответ '
+            'со статусом 404.'
+        )
@@ -0,0 +1,162 @@
+import csv
+import shutil
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from tests.conftest import MANAGE_PATH
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title, User)
+
+
+def run_import(*args):
+    out = StringIO()
+    call_command('import', *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    shutil.copytree(f'{MANAGE_PATH}/static/data', tmp_path / 'data')
+    return tmp_path / 'data'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10Import:
+
+    def test_01_import_all(self, data_dir):
+        run_import('--all', '--dir', str(data_dir))
+        with open(data_dir / 'review.csv', encoding='utf-8-sig') as data:
+            reviews = list(csv.DictReader(data))
+        assert Review.objects.count() == len(reviews), (
+            'Проверьте, что `import --all` загружает все отзывы.'
+        )
+        assert Comment.objects.exists(), (
+            'Проверьте, что `import --all` загружает комментарии после '
+            'отзывов.'
+        )
+        title = Title.objects.get(pk=1)
+        scores = [int(row['score']) for row in reviews
+                  if row['title_id'] == '1']
+        assert title.rating == sum(scores) / len(scores), (
+            'Проверьте, что после импорта отзывов пересчитывается рейтинг '
+            'произведений.'
+        )
+
+    def test_02_upsert(self, data_dir):
+        run_import('--all', '--dir', str(data_dir))
+        output = run_import('--all', '--upsert', '--dir', str(data_dir))
+        assert output.count('файл не изменился') == 7, (
+            'Проверьте, что `import --upsert` пропускает файлы, которые '
+            'не изменились с прошлого импорта.'
+        )
+
+        with open(data_dir / 'category.csv', 'a', encoding='utf-8') as data:
+            data.write('\n4,Сериал,series\n')
+        path = data_dir / 'genre.csv'
+        path.write_text(
+            path.read_text(encoding='utf-8-sig').replace('Драма', 'Драмы'),
+            encoding='utf-8'
+        )
+        output = run_import('--all', '--upsert', '--dir', str(data_dir))
+        assert Category.objects.filter(slug='series').exists(), (
+            'Проверьте, что `import --upsert` добавляет новые строки.'
+        )
+        assert Category.objects.count() == 4, (
+            'Проверьте, что `import --upsert` не дублирует строки.'
+        )
+        assert output.count('файл не изменился') == 5, (
+            'Проверьте, что `import --upsert` обрабатывает только '
+            'изменившиеся файлы.'
+        )
+
+    def test_03_export_roundtrip(self, data_dir, tmp_path):
+        run_import('--all', '--dir', str(data_dir))
+        dump = tmp_path / 'dump'
+        call_command('export', '--dir', str(dump), stdout=StringIO())
+        expected = {
+            'reviews': list(Review.objects.values_list(
+                'id', 'title_id', 'author_id', 'score', 'pub_date')),
+            'ratings': list(Title.objects.values_list('id', 'rating')),
+        }
+        for model in (Comment, Review, GenreTitle, Title, Genre, Category,
+                      User):
+            model.objects.all().delete()
+
+        run_import('--all', '--dir', str(dump))
+        assert list(Review.objects.values_list(
+            'id', 'title_id', 'author_id', 'score', 'pub_date'
+        )) == expected['reviews'], (
+            'Проверьте, что файлы `export` снова загружаются командой '
+            '`import` без потери данных.'
+        )
+        assert list(Title.objects.values_list(
+            'id', 'rating')) == expected['ratings'], (
+            'Проверьте, что после выгрузки и загрузки рейтинги совпадают.'
+        )
+
+    def test_04_export_endpoint(self, client, user_client, admin_client,
+                                data_dir):
+        run_import('--all', '--dir', str(data_dir))
+        url = '/api/v1/export/titles.ndjson'
+        for api_client in (client, user_client):
+            response = api_client.get(url)
+            assert response.status_code in (401, 403), (
+                f'Проверьте, что `{url}` доступен только администратору.'
+            )
+        response = admin_client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос администратора к `{url}` возвращает '
+            'ответ со статусом 200.'
+        )
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert len(lines) == Title.objects.count(), (
+            f'Проверьте, что `{url}` выгружает по строке на произведение.'
+        )
+        response = admin_client.get('/api/v1/export/review.csv')
+        header = next(iter(response.streaming_content)).decode()
+        assert header.strip() == 'id,title_id,text,author,score,pub_date', (
+            'Проверьте, что CSV-выгрузка использует формат файлов `import`.'
+        )
+
+    def test_05_upsert_composite_key(self, tmp_path, category):
+        Title.objects.bulk_create(
+            Title(name=f'Фильм {number}', year=2000, category=category)
+            for number in range(30))
+        Genre.objects.bulk_create(
+            Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+            for number in range(40))
+        titles = list(Title.objects.order_by('id'))
+        genres = list(Genre.objects.order_by('id'))
+        path = tmp_path / 'genre_title.csv'
+        rows = [f'{title.id},{genre.id}' for title in titles
+                for genre in genres]
+        path.write_text('title_id,genre_id\n' + '\n'.join(rows),
+                        encoding='utf-8')
+        args = ('-a', 'reviews', '-m', 'GenreTitle', '-f', path.name,
+                '--dir', str(tmp_path), '--batch-size', '2000', '--upsert')
+        run_import(*args)
+        path.write_text(path.read_text(encoding='utf-8') + '\n',
+                        encoding='utf-8')
+        run_import(*args)
+        assert GenreTitle.objects.count() == len(rows), (
+            'Проверьте, что `import --upsert` находит существующие строки '
+            'по составному ключу в пачке больше 1000 строк.'
+        )
+
+    def test_06_censorship(self, data_dir):
+        args = ('-a', 'reviews', '-m', 'Review', '-f', 'review.csv',
+                '--dir', str(data_dir), '--reject-censored')
+        with pytest.raises(CommandError, match='запрещённые слова'):
+            run_import(*args)
+        assert not Review.objects.exists(), (
+            'Проверьте, что `import --reject-censored` не загружает файл '
+            'с запрещёнными словами.'
+        )
+        output = run_import('--all', '--dir', str(data_dir))
+        assert 'строка 10 (id 6) <хрен>' in output, (
+            'Проверьте, что `import` перечисляет строки с запрещёнными '
+            'словами, которые bulk_create не проверяет.'
+        )
@@ -0,0 +1,85 @@
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from reviews.models import OutboxEmail
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class CrashingBackend(BaseEmailBackend):
+    """Падение воркера посреди отправки."""
+
+    in_atomic_block = None
+
+    def send_messages(self, email_messages):
+        CrashingBackend.in_atomic_block = connection.in_atomic_block
+        raise KeyboardInterrupt
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11Outbox:
+    url_signup = '/api/v1/auth/signup/'
+
+    def test_01_signup_queues_email(self, client):
+        outbox_before_count = len(mail.outbox)
+        data = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+        client.post(self.url_signup, data=data)
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что письмо с кодом подтверждения не отправляется '
+            'во время запроса к `/api/v1/auth/signup/`.'
+        )
+        assert OutboxEmail.objects.filter(
+            to=data['email'], sent_at__isnull=True).exists(), (
+            'Проверьте, что письмо с кодом подтверждения ставится в очередь.'
+        )
+
+        call_command('run_outbox', '--once')
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            'Проверьте, что `run_outbox` отправляет письма из очереди.'
+        )
+        assert not OutboxEmail.objects.filter(sent_at__isnull=True).exists()
+
+    def test_02_retry_with_backoff(self, client, settings):
+        settings.EMAIL_BACKEND = 'tests.test_11_outbox.FailingBackend'
+        data = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+        client.post(self.url_signup, data=data)
+
+        call_command('run_outbox', '--once')
+        email = OutboxEmail.objects.get(to=data['email'])
+        assert email.sent_at is None and email.attempts == 1, (
+            'Проверьте, что неудачная отправка увеличивает счётчик попыток.'
+        )
+        assert email.next_attempt_at > email.created_at, (
+            'Проверьте, что повторная попытка откладывается.'
+        )
+        assert 'SMTP' in email.last_error
+
+        call_command('run_outbox', '--once')
+        email.refresh_from_db()
+        assert email.attempts == 1, (
+            'Проверьте, что письмо не отправляется повторно до истечения '
+            'паузы.'
+        )
+
+    def test_03_claim_outside_transaction(self, client, settings):
+        settings.EMAIL_BACKEND = 'tests.test_11_outbox.CrashingBackend'
+        data = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+        client.post(self.url_signup, data=data)
+
+        call_command('run_outbox', '--once')
+        assert CrashingBackend.in_atomic_block is False, (
+            'Проверьте, что письма отправляются вне транзакции.'
+        )
+        email = OutboxEmail.objects.get(to=data['email'])
+        assert email.attempts == 1 and email.next_attempt_at > (
+            timezone.now()), (
+            'Проверьте, что письмо захватывается до отправки и после '
+            'падения воркера не отправляется сразу повторно.'
+        )
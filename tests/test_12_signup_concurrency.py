@@ -0,0 +1,60 @@
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from itertools import product
+
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+
+from reviews.models import User
+
+
+def signup(data):
+    try:
+        return APIClient().post('/api/v1/auth/signup/', data=data)
+    finally:
+        connection.close()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12SignupConcurrency:
+    url_signup = '/api/v1/auth/signup/'
+
+    def test_01_parallel_signups(self):
+        usernames = ('alpha', 'beta', 'gamma')
+        emails = ('one@yamdb.fake', 'two@yamdb.fake', 'three@yamdb.fake')
+        requests = [
+            {'username': username, 'email': email}
+            for username, email in product(usernames, emails)
+        ] * 3
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(executor.map(signup, requests))
+
+        statuses = {response.status_code for response in responses}
+        assert statuses <= {HTTPStatus.OK, HTTPStatus.BAD_REQUEST}, (
+            'Проверьте, что параллельные запросы к `/api/v1/auth/signup/` '
+            'с пересекающимися `username` и `email` возвращают ответ '
+            'со статусом 200 или 400.'
+        )
+        users = set(User.objects.values_list('username', 'email'))
+        assert len({username for username, _ in users}) == len(users), (
+            'Проверьте, что при параллельной регистрации `username` '
+            'остаётся уникальным.'
+        )
+        assert len({email for _, email in users}) == len(users), (
+            'Проверьте, что при параллельной регистрации `email` '
+            'остаётся уникальным.'
+        )
+        for data, response in zip(requests, responses):
+            pair = (data['username'], data['email'])
+            if response.status_code == HTTPStatus.OK:
+                assert pair in users, (
+                    'Проверьте, что успешная регистрация создаёт '
+                    'пользователя с переданными `username` и `email`.'
+                )
+            else:
+                assert pair not in users
+                assert set(response.json()) <= {'username', 'email'}, (
+                    'Проверьте, что при конфликте в ответе указано '
+                    'поле, которое уже занято.'
+                )
@@ -0,0 +1,130 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Title, User
+
+
+def get_token_client(client, user):
+    response = client.post('/api/v1/auth/token/', data={
+        'username': user.username,
+        'confirmation_code': default_token_generator.make_token(user)
+    })
+    assert response.status_code == HTTPStatus.OK, (
+        'Проверьте, что POST-запрос к `/api/v1/auth/token/` с корректными '
+        'данными возвращает ответ со статусом 200.'
+    )
+    token_client = APIClient()
+    token_client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}')
+    return token_client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13StatelessJWT:
+
+    def test_01_no_user_query(self, client, admin,
+                              django_assert_num_queries):
+        admin_client = get_token_client(client, admin)
+        Category.objects.create(name='Книги', slug='books')
+        # Версия списка для ETag, COUNT и SELECT категорий,
+        # без запроса пользователя.
+        with django_assert_num_queries(3):
+            response = admin_client.get('/api/v1/categories/')
+        assert response.status_code == HTTPStatus.OK
+
+        response = admin_client.post(
+            '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'})
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что роль администратора из токена даёт право '
+            'создавать категории.'
+        )
+
+    def test_02_full_user_when_needed(self, client, user):
+        user_client = get_token_client(client, user)
+        response = user_client.get('/api/v1/users/me/')
+        assert response.json()['email'] == user.email, (
+            'Проверьте, что `/api/v1/users/me/` возвращает данные '
+            'пользователя из базы.'
+        )
+        response = user_client.post(
+            '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'})
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что роль пользователя из токена не даёт права '
+            'создавать категории.'
+        )
+
+        title = Title.objects.create(name='Терминатор', year=1984)
+        response = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Отличный фильм', 'score': 8})
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['author'] == user.username, (
+            'Проверьте, что автором отзыва становится пользователь '
+            'из токена.'
+        )
+
+    def test_03_deleted_or_inactive_user(self, client, user):
+        title = Title.objects.create(name='Терминатор', year=1984)
+        user_client = get_token_client(client, user)
+        user.is_active = False
+        user.save()
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен неактивного пользователя отклоняется.'
+        )
+        user.is_active = True
+        user.save()
+        user_client = get_token_client(client, user)
+        user.delete()
+        response = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Отличный фильм', 'score': 8})
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен удалённого пользователя отклоняется.'
+        )
+
+    def test_04_stale_user_state(self, client, user):
+        user_client = get_token_client(client, user)
+        # update() не вызывает сигналов: в кеше остаётся активный
+        # пользователь, запись из базы всё равно проверяется.
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что `/api/v1/users/me/` для неактивного '
+            'пользователя возвращает 401, а не 500.'
+        )
+        User.objects.filter(pk=user.pk).delete()
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен удалённого пользователя отклоняется.'
+        )
+
+    def test_05_demoted_admin(self, client, admin):
+        admin_client = get_token_client(client, admin)
+        admin.role = 'user'
+        admin.is_staff = False
+        admin.save()
+        response = admin_client.post(
+            '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'})
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что после смены роли старый токен отклоняется.'
+        )
+        response = get_token_client(client, admin).post(
+            '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'})
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что новый токен содержит новую роль.'
+        )
+
+    def test_06_username_change(self, client, user):
+        user_client = get_token_client(client, user)
+        response = user_client.patch('/api/v1/users/me/',
+                                     data={'username': 'renamed'})
+        assert response.status_code == HTTPStatus.OK
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что смена имени не делает токен недействительным.'
+        )
+        assert response.json()['username'] == 'renamed'
@@ -0,0 +1,81 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from django.db import transaction
+
+from reviews.cache import get_or_compute, get_titles_version
+from reviews.models import Review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitleCache:
+
+    def test_01_list_and_detail_cached(self, client, title, category,
+                                       author, django_assert_num_queries):
+        for url in ('/api/v1/titles/', f'/api/v1/titles/{title.id}/'):
+            client.get(url)
+            with django_assert_num_queries(0):
+                response = client.get(url)
+            assert response.status_code == 200, (
+                f'Проверьте, что повторный GET-запрос к `{url}` отдаётся '
+                'из кеша.'
+            )
+
+        Review.objects.create(author=author, title=title, text='ok', score=7)
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.json()['rating'] == 7, (
+            'Проверьте, что новый отзыв сбрасывает кеш произведения.'
+        )
+        response = client.get('/api/v1/titles/?category=books')
+        assert response.json()['count'] == 0, (
+            'Проверьте, что параметры фильтрации входят в ключ кеша.'
+        )
+
+        category.name = 'Кино'
+        category.save()
+        response = client.get('/api/v1/titles/')
+        assert response.json()['results'][0]['category']['name'] == 'Кино', (
+            'Проверьте, что изменение категории сбрасывает кеш списка.'
+        )
+
+    def test_02_invalidate_on_commit(self, client, title, author):
+        url = f'/api/v1/titles/{title.id}/'
+        assert client.get(url).json()['rating'] is None
+
+        version = get_titles_version()
+        with transaction.atomic():
+            review = Review.objects.create(author=author, title=title,
+                                           text='ok', score=7)
+            assert get_titles_version() == version, (
+                'Проверьте, что версия кеша меняется только после коммита, '
+                'когда новый рейтинг уже записан.'
+            )
+        assert get_titles_version() != version
+        assert client.get(url).json()['rating'] == 7, (
+            'Проверьте, что после нового отзыва отдаётся новый рейтинг.'
+        )
+
+        review.score = 3
+        review.save()
+        assert client.get(url).json()['rating'] == 3, (
+            'Проверьте, что после изменения отзыва отдаётся новый рейтинг.'
+        )
+
+    def test_03_single_recompute(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'value'
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            results = list(executor.map(
+                lambda _: get_or_compute('test:stampede', compute), range(5)))
+        assert results == ['value'] * 5
+        assert len(calls) == 1, (
+            'Проверьте, что просроченный ключ пересчитывает только один '
+            'воркер.'
+        )
@@ -0,0 +1,66 @@
+import re
+
+import pytest
+from django.db import connection
+
+from reviews.models import Title
+from reviews.search import search_titles
+
+
+def search(client, text):
+    response = client.get('/api/v1/titles/', {'search': text})
+    assert response.status_code == 200, (
+        'Проверьте, что GET-запрос к `/api/v1/titles/?search=` возвращает '
+        'ответ со статусом 200.'
+    )
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TitleSearch:
+
+    def test_01_search(self, client):
+        Title.objects.create(name='Терминатор', year=1984,
+                             description='Киборг из будущего')
+        Title.objects.create(name='Терминатор 2', year=1991,
+                             description='Терминатор снова возвращается')
+        Title.objects.create(name='Крепкий орешек', year=1988)
+
+        assert search(client, 'терм') == ['Терминатор 2', 'Терминатор'], (
+            'Проверьте, что `search` ищет по началу слова без учёта '
+            'регистра и сортирует результаты по релевантности.'
+        )
+        assert search(client, 'КИБОРГ') == ['Терминатор'], (
+            'Проверьте, что `search` ищет и по описанию произведения.'
+        )
+        assert search(client, 'крепк ореш') == ['Крепкий орешек']
+        assert search(client, '"*') == []
+
+    def test_02_index_follows_changes(self, client):
+        title = Title.objects.create(name='Терминатор', year=1984)
+        title.name = 'Чужой'
+        title.save()
+        assert search(client, 'терм') == [], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'произведения.'
+        )
+        assert search(client, 'чуж') == ['Чужой']
+        title.delete()
+        assert search(client, 'чуж') == [], (
+            'Проверьте, что удалённое произведение пропадает из поиска.'
+        )
+
+    def test_03_index_drives_query(self):
+        Title.objects.create(name='Терминатор', year=1984)
+        queryset = search_titles(
+            Title.objects.select_related('category').order_by('id'), 'терм')
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = [row[-1] for row in cursor.fetchall()]
+        assert not any(re.match(r'SCAN reviews_title\b', line)
+                       for line in plan), (
+            'Проверьте, что поиск отбирает произведения по индексу FTS5, '
+            f'а не перебирает всю таблицу: {plan}'
+        )
+        assert [title.name for title in queryset] == ['Терминатор']
@@ -0,0 +1,72 @@
+import json
+import logging
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16RequestTiming:
+
+    @pytest.fixture(autouse=True)
+    def sample_all(self, settings):
+        settings.REQUEST_TIMING_SAMPLE_RATE = 1
+
+    def test_01_server_timing_header(self, admin_client, category):
+        response = admin_client.get('/api/v1/categories/')
+        header = response.get('Server-Timing', '')
+        assert 'db;dur=' in header and 'queries' in header, (
+            'Проверьте, что ответ содержит заголовок `Server-Timing` '
+            'со временем и числом запросов к базе.'
+        )
+        assert 'serializer;dur=' in header and 'total;dur=' in header, (
+            'Проверьте, что `Server-Timing` содержит время сериализации '
+            'и всего запроса.'
+        )
+
+    def test_02_json_log_and_slow_queries(self, client, settings, caplog,
+                                          category):
+        settings.REQUEST_TIMING_LOG = True
+        settings.SLOW_QUERY_MS = 0
+        with caplog.at_level(logging.INFO, logger='api.timing'):
+            client.get('/api/v1/categories/')
+        records = [json.loads(record.getMessage())
+                   for record in caplog.records
+                   if record.levelno == logging.INFO]
+        assert len(records) == 1, (
+            'Проверьте, что на запрос пишется одна JSON-строка в лог.'
+        )
+        record = records[0]
+        assert (record['view'], record['action'], record['route']) == (
+            'CategoryViewSet', 'list', 'category-list'), (
+            'Проверьте, что запись помечена view и действием DRF.'
+        )
+        # Версия списка для ETag, COUNT и SELECT категорий.
+        assert record['queries'] == 3, (
+            'Проверьте подсчёт SQL-запросов в записи лога.'
+        )
+        assert any('reviews_category' in record.getMessage()
+                   for record in caplog.records
+                   if record.levelno == logging.WARNING), (
+            'Проверьте, что медленные запросы пишутся в лог вместе с SQL.'
+        )
+
+    def test_03_sampling(self, client, settings):
+        settings.REQUEST_TIMING_SAMPLE_RATE = 0
+        response = client.get('/api/v1/categories/')
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что незамеряемые запросы проходят без заголовка.'
+        )
+
+    def test_04_header_for_admin_or_debug(self, client, user_client,
+                                          settings):
+        for api_client in (client, user_client):
+            response = api_client.get('/api/v1/categories/')
+            assert 'Server-Timing' not in response, (
+                'Проверьте, что `Server-Timing` не отдаётся '
+                'не-администраторам.'
+            )
+        settings.DEBUG = True
+        response = client.get('/api/v1/categories/')
+        assert 'Server-Timing' in response, (
+            'Проверьте, что при DEBUG `Server-Timing` отдаётся всем.'
+        )
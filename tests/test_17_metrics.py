@@ -0,0 +1,94 @@
+import pytest
+
+from reviews.metrics import metrics
+
+
+@pytest.fixture
+def clean_metrics(settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path)
+    settings.METRICS_ALLOWED_IPS = ('127.0.0.1',)
+    metrics.reset()
+    yield tmp_path
+    metrics.reset()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Metrics:
+
+    def test_01_request_metrics(self, client, clean_metrics, title):
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/100500/')
+
+        response = client.get('/metrics')
+        assert response.status_code == 200, (
+            'Проверьте, что `/metrics` доступен с адреса из '
+            'METRICS_ALLOWED_IPS без токена.'
+        )
+        assert response['Content-Type'].startswith('text/plain'), (
+            'Проверьте, что `/metrics` отдаётся в текстовом формате.'
+        )
+        body = response.content.decode()
+        assert ('yamdb_http_requests_total{method="GET",route="titles-list",'
+                'status="200"} 2') in body, (
+            'Проверьте, что запросы считаются по маршруту и коду ответа.'
+        )
+        assert 'route="titles-detail",status="404"' in body, (
+            'Проверьте, что ответы с ошибкой считаются отдельно.'
+        )
+        assert ('yamdb_http_request_duration_seconds_count{method="GET",'
+                'route="titles-list",status="200"} 2') in body, (
+            'Проверьте гистограмму времени ответа.'
+        )
+        assert 'yamdb_list_rows_bucket{route="titles-list",le="1"} 2' in body, (
+            'Проверьте гистограмму числа объектов в ответе list.'
+        )
+        assert ('yamdb_cache_hit_ratio{cache="titles"} '
+                '0.3333333333333333') in body, (
+            'Проверьте долю попаданий в кеш.'
+        )
+
+    def test_02_workers_aggregated(self, client, clean_metrics):
+        (clean_metrics / '1.json').write_text(
+            '{"counters": [["yamdb_http_requests_total", '
+            '[["method", "GET"], ["route", "category-list"], '
+            '["status", "200"]], 5]], "histograms": []}')
+        client.get('/api/v1/categories/')
+        body = client.get('/metrics').content.decode()
+        assert ('yamdb_http_requests_total{method="GET",route="category-list",'
+                'status="200"} 6') in body, (
+            'Проверьте, что `/metrics` суммирует счётчики всех воркеров.'
+        )
+
+    def test_03_censorship_duration(self, client, clean_metrics,
+                                    admin_client, title):
+        admin_client.post(f'/api/v1/titles/{title.id}/reviews/',
+                          data={'text': 'Отличный фильм', 'score': 9})
+        body = client.get('/metrics').content.decode()
+        assert 'yamdb_censorship_check_seconds_count ' in body, (
+            'Проверьте, что время проверки цензуры попадает в метрики.'
+        )
+
+    def test_04_access_and_precision(self, client, admin_client, user_client,
+                                     clean_metrics):
+        metrics.inc('yamdb_http_requests_total', 1234567, route='titles-list',
+                    method='GET', status='200')
+        metrics.observe('yamdb_list_rows', 2, route='titles-list')
+        body = client.get('/metrics').content.decode()
+        assert ('yamdb_http_requests_total{method="GET",route="titles-list",'
+                'status="200"} 1234567') in body, (
+            'Проверьте, что большие счётчики выводятся без потери точности.'
+        )
+        assert 'yamdb_list_rows_sum{route="titles-list"} 2.0' in body
+
+        response = client.get('/metrics', REMOTE_ADDR='10.0.0.5')
+        assert response.status_code in (401, 403), (
+            'Проверьте, что `/metrics` закрыт для посторонних адресов.'
+        )
+        response = user_client.get('/metrics', REMOTE_ADDR='10.0.0.5')
+        assert response.status_code == 403
+        response = admin_client.get('/metrics', REMOTE_ADDR='10.0.0.5')
+        assert response.status_code == 200, (
+            'Проверьте, что администратору `/metrics` доступен с любого '
+            'адреса.'
+        )
@@ -0,0 +1,86 @@
+import os
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from api.profiling import list_profiles, sign_profile_key
+
+
+@pytest.fixture
+def profile_dir(settings, tmp_path):
+    settings.PROFILE_DIR = str(tmp_path)
+    return tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Profiling:
+
+    def test_01_admin_header(self, admin_client, user_client, profile_dir):
+        response = user_client.get('/api/v1/categories/', HTTP_X_PROFILE='1')
+        assert 'X-Profile-Id' not in response, (
+            'Проверьте, что профилировать запросы может только администратор.'
+        )
+        response = admin_client.get('/api/v1/categories/',
+                                    HTTP_X_PROFILE='1')
+        profile_id = response.get('X-Profile-Id')
+        assert profile_id, (
+            'Проверьте, что заголовок `X-Profile` от администратора '
+            'включает профилирование и возвращает `X-Profile-Id`.'
+        )
+        assert os.path.exists(profile_dir / f'{profile_id}.prof'), (
+            'Проверьте, что профиль сохраняется в PROFILE_DIR.'
+        )
+
+    def test_02_signed_param(self, client, admin, user, token_admin,
+                             settings, profile_dir, capsys):
+        response = client.get(
+            f'/api/v1/genres/?profile={token_admin["access"]}')
+        assert 'X-Profile-Id' not in response, (
+            'Проверьте, что токен доступа в `?profile=` не принимается.'
+        )
+        call_command('profiles', key=admin.username)
+        key = capsys.readouterr().out.strip()
+        response = client.get(f'/api/v1/genres/?profile={key}')
+        assert response.get('X-Profile-Id'), (
+            'Проверьте, что `?profile=<ключ из profiles --key>` включает '
+            'профилирование.'
+        )
+        assert list_profiles()[0]['path'] == '/api/v1/genres/', (
+            'Проверьте, что ключ из `?profile=` не сохраняется с профилем.'
+        )
+        for broken in ('broken', sign_profile_key(user)):
+            response = client.get(f'/api/v1/genres/?profile={broken}')
+            assert 'X-Profile-Id' not in response, (
+                'Проверьте, что неверный ключ или ключ не администратора '
+                'в `?profile=` игнорируется.'
+            )
+        settings.PROFILE_KEY_MAX_AGE = -1
+        response = client.get(f'/api/v1/genres/?profile={key}')
+        assert 'X-Profile-Id' not in response, (
+            'Проверьте, что просроченный ключ игнорируется.'
+        )
+        with pytest.raises(CommandError):
+            call_command('profiles', key=user.username)
+
+    def test_03_ring_buffer_and_command(self, client, settings,
+                                        profile_dir, capsys):
+        settings.PROFILE_SAMPLE_EVERY = 1
+        settings.PROFILE_MAX_COUNT = 2
+        ids = [client.get('/api/v1/categories/')['X-Profile-Id']
+               for _ in range(3)]
+        assert len(list(profile_dir.glob('*.prof'))) == 2, (
+            'Проверьте, что хранится не больше PROFILE_MAX_COUNT профилей.'
+        )
+        assert not (profile_dir / f'{ids[0]}.prof').exists(), (
+            'Проверьте, что из буфера удаляются самые старые профили.'
+        )
+
+        call_command('profiles')
+        output = capsys.readouterr().out
+        assert ids[2] in output and 'CategoryViewSet.list' in output, (
+            'Проверьте, что команда `profiles` выводит список профилей.'
+        )
+        call_command('profiles', ids[2])
+        assert 'function calls' in capsys.readouterr().out, (
+            'Проверьте, что команда `profiles <id>` выводит статистику.'
+        )
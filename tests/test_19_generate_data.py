@@ -0,0 +1,44 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.models import Comment, Review, Title, User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19GenerateData:
+
+    def generate(self, **options):
+        call_command('generate_data', titles=20, users=15, reviews=120,
+                     comments=40, genres=4, categories=2, **options)
+
+    def test_01_counts_and_distribution(self):
+        self.generate()
+        assert (Title.objects.count(), Review.objects.count(),
+                Comment.objects.count()) == (20, 120, 40), (
+            'Проверьте, что `generate_data` создаёт заданное число '
+            'произведений, отзывов и комментариев.'
+        )
+        counts = sorted(
+            (title.review_count for title in Title.objects.all()),
+            reverse=True)
+        assert counts[0] == 15 and counts[-1] < counts[0], (
+            'Проверьте, что отзывы распределяются неравномерно и не больше '
+            'одного отзыва пользователя на произведение.'
+        )
+        assert Title.objects.filter(rating__isnull=False).count() == sum(
+            1 for count in counts if count), (
+            'Проверьте, что после генерации пересчитываются рейтинги.'
+        )
+        assert User.objects.get(username='bench_admin').is_admin, (
+            'Проверьте, что для бенчмарков создаётся администратор.'
+        )
+
+    def test_02_clear(self):
+        self.generate()
+        with pytest.raises(CommandError):
+            self.generate()
+        self.generate(clear=True, seed=1)
+        assert Review.objects.count() == 120, (
+            'Проверьте, что `--clear` заменяет прошлую генерацию.'
+        )
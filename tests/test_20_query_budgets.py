@@ -0,0 +1,119 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+from api.authentication import RoleAccessToken
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from tests.query_budget import (assert_query_budget, query_budget,
+                                request_within_budget)
+
+TITLE = '/api/v1/titles/{title}/'
+REVIEWS = TITLE + 'reviews/'
+REVIEW = REVIEWS + '{review}/'
+COMMENTS = REVIEW + 'comments/'
+COMMENT = COMMENTS + '{comment}/'
+CASES = (
+    ('get', '/api/v1/users/', None, HTTPStatus.OK),
+    ('get', '/api/v1/users/{username}/', None, HTTPStatus.OK),
+    ('post', '/api/v1/users/',
+     {'username': 'new_user', 'email': 'new@yamdb.fake'}, HTTPStatus.CREATED),
+    ('patch', '/api/v1/users/{username}/', {'bio': 'Обо мне'}, HTTPStatus.OK),
+    ('delete', '/api/v1/users/{username}/', None, HTTPStatus.NO_CONTENT),
+    ('get', '/api/v1/users/me/', None, HTTPStatus.OK),
+    ('patch', '/api/v1/users/me/', {'bio': 'Обо мне'}, HTTPStatus.OK),
+    ('get', '/api/v1/categories/', None, HTTPStatus.OK),
+    ('post', '/api/v1/categories/', {'name': 'Музыка', 'slug': 'music'},
+     HTTPStatus.CREATED),
+    ('delete', '/api/v1/categories/{category}/', None, HTTPStatus.NO_CONTENT),
+    ('get', '/api/v1/genres/', None, HTTPStatus.OK),
+    ('post', '/api/v1/genres/', {'name': 'Рок', 'slug': 'rock'},
+     HTTPStatus.CREATED),
+    ('delete', '/api/v1/genres/{genre}/', None, HTTPStatus.NO_CONTENT),
+    ('get', '/api/v1/titles/', None, HTTPStatus.OK),
+    ('get', TITLE, None, HTTPStatus.OK),
+    ('post', '/api/v1/titles/',
+     {'name': 'Новое', 'year': 2000, 'genre': ['drama', 'comedy'],
+      'category': 'films'}, HTTPStatus.CREATED),
+    ('patch', TITLE, {'name': 'Другое', 'genre': ['drama']}, HTTPStatus.OK),
+    ('delete', TITLE, None, HTTPStatus.NO_CONTENT),
+    ('post', '/api/v1/titles/batch/', {'ids': [3, 1, 2, 100]}, HTTPStatus.OK),
+    ('get', REVIEWS, None, HTTPStatus.OK),
+    ('get', REVIEW, None, HTTPStatus.OK),
+    ('post', TITLE.format(title='{other_title}') + 'reviews/',
+     {'text': 'Хорошо', 'score': 8}, HTTPStatus.CREATED),
+    ('patch', REVIEW, {'text': 'Уже не так хорошо'}, HTTPStatus.OK),
+    ('delete', REVIEW, None, HTTPStatus.NO_CONTENT),
+    ('get', COMMENTS, None, HTTPStatus.OK),
+    ('get', COMMENT, None, HTTPStatus.OK),
+    ('post', COMMENTS, {'text': 'Согласен'}, HTTPStatus.CREATED),
+    ('patch', COMMENT, {'text': 'Не согласен'}, HTTPStatus.OK),
+    ('delete', COMMENT, None, HTTPStatus.NO_CONTENT),
+)
+
+
+@pytest.fixture
+def catalog(admin):
+    films = Category.objects.create(name='Фильм', slug='films')
+    Category.objects.create(name='Книги', slug='books')
+    genres = [Genre.objects.create(name=name, slug=slug) for name, slug in (
+        ('Драма', 'drama'), ('Комедия', 'comedy'), ('Триллер', 'thriller'))]
+    titles = []
+    for number in range(3):
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=2000 + number,
+            category=films)
+        title.genre.set(genres[number:number + 2])
+        titles.append(title)
+    authors = [User.objects.create(username=f'author{number}',
+                                   email=f'author{number}@yamdb.fake')
+               for number in range(3)]
+    reviews = [Review.objects.create(author=author, title=titles[0],
+                                     text='Отзыв', score=number + 5)
+               for number, author in enumerate(authors)]
+    comments = [Comment.objects.create(author=author, review=reviews[0],
+                                       text='Комментарий')
+                for author in authors]
+    return {
+        'username': authors[1].username, 'category': films.slug,
+        'genre': genres[0].slug, 'title': titles[0].id,
+        'other_title': titles[1].id, 'review': reviews[0].id,
+        'comment': comments[0].id,
+    }
+
+
+@pytest.fixture
+def role_admin_client(admin):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(admin)}')
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20QueryBudgets:
+
+    @pytest.mark.parametrize('method,url,data,status', CASES)
+    def test_01_route_budgets(self, role_admin_client, catalog,
+                              method, url, data, status):
+        url = url.format(**catalog)
+        response = request_within_budget(
+            role_admin_client, method, url, data=data, format='json')
+        assert response.status_code == status, (
+            f'Проверьте, что {method.upper()}-запрос к `{url}` возвращает '
+            f'ответ со статусом {status.value}.'
+        )
+
+    def test_02_budget_failure_shows_sql(self):
+        with pytest.raises(AssertionError) as error:
+            with assert_query_budget('users', 'retrieve'):
+                list(User.objects.all())
+                list(Title.objects.all())
+        assert 'reviews_title' in str(error.value), (
+            'Проверьте, что при превышении бюджета выводятся SQL-запросы.'
+        )
+
+    @query_budget('category', 'list')
+    def test_03_decorator(self, client):
+        response = client.get('/api/v1/categories/')
+        assert response.status_code == HTTPStatus.OK
@@ -0,0 +1,43 @@
+import pytest
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from api.serializers import (CommentSerializer, ReviewSerializer,
+                             TitleViewSerializer)
+from reviews.models import Comment, Genre, Review, Title
+
+
+def render_both(serializer_class, instances):
+    serializer = serializer_class(instances, many=True)
+    fast = serializer.data
+    generic = [
+        serializers.ModelSerializer.to_representation(serializer.child, item)
+        for item in instances
+    ]
+    renderer = JSONRenderer()
+    return renderer.render(fast), renderer.render(generic)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21FastSerializers:
+
+    def test_01_same_json_as_drf_fields(self, title, author):
+        title.description = '"Кавычки"\n и \\'
+        title.save()
+        title.genre.add(Genre.objects.create(name='Комедия', slug='comedy'))
+        Title.objects.create(name='Без категории', year=2000)
+        review = Review.objects.create(author=author, title=title,
+                                       text='Отзыв', score=7)
+        Comment.objects.create(author=author, review=review, text='Ответ')
+
+        for serializer_class, queryset in (
+                (TitleViewSerializer, Title.objects.select_related(
+                    'category').prefetch_related('genre').order_by('id')),
+                (ReviewSerializer, Review.objects.select_related('author')),
+                (CommentSerializer, Comment.objects.select_related('author')),
+        ):
+            fast, generic = render_both(serializer_class, list(queryset))
+            assert fast == generic, (
+                f'Проверьте, что быстрый `{serializer_class.__name__}` '
+                'выдаёт тот же JSON, что и поля DRF.'
+            )
@@ -0,0 +1,64 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from http import HTTPStatus
+
+import msgpack
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import ORJSONRenderer
+from reviews.models import Review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Renderers:
+
+    @pytest.fixture
+    def reviewed_title(self, title, author):
+        title.name = 'Терминатор\u2028'
+        title.save()
+        Review.objects.create(author=author, title=title, text='ок', score=7)
+        return title
+
+    def test_01_same_json_as_drf(self, client, reviewed_title):
+        for url in ('/api/v1/titles/',
+                    f'/api/v1/titles/{reviewed_title.id}/reviews/'):
+            response = client.get(url)
+            assert response['Content-Type'] == 'application/json', (
+                f'Проверьте, что `{url}` по умолчанию отдаёт JSON.'
+            )
+            assert response.content == JSONRenderer().render(
+                response.data), (
+                'Проверьте, что orjson выдаёт тот же JSON, что JSONRenderer.'
+            )
+        data = {'date': datetime(2020, 1, 2, 3, 4, 5, 678901,
+                                 tzinfo=timezone.utc),
+                'price': Decimal('1.50'), 1: None}
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data), (
+            'Проверьте, что даты, Decimal и нестроковые ключи кодируются '
+            'как в JSONRenderer.'
+        )
+
+    def test_02_msgpack_by_accept(self, client, reviewed_title):
+        url = f'/api/v1/titles/{reviewed_title.id}/reviews/'
+        response = client.get(url, HTTP_ACCEPT='application/msgpack')
+        assert response['Content-Type'] == 'application/msgpack', (
+            'Проверьте, что `Accept: application/msgpack` выбирает msgpack.'
+        )
+        assert msgpack.unpackb(response.content) == client.get(url).json(), (
+            'Проверьте, что msgpack содержит те же данные, что и JSON.'
+        )
+
+    def test_03_orjson_parser(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/categories/', data='{"name": "Книги", "slug": "books"}',
+            content_type='application/json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что JSON в теле запроса разбирается.'
+        )
+        response = admin_client.post(
+            '/api/v1/categories/', data='{"name": ',
+            content_type='application/json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что некорректный JSON возвращает 400.'
+        )
@@ -0,0 +1,103 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from reviews.models import Category, Genre, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23ConditionalGet:
+
+    def assert_not_modified(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.has_header('ETag') and response.has_header(
+            'Last-Modified'), (
+            f'Проверьте, что `{url}` отдаёт заголовки ETag и Last-Modified.'
+        )
+        etag = response['ETag']
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что `{url}` с актуальным If-None-Match '
+            'возвращает 304.'
+        )
+        assert response['ETag'] == etag and not response.content, (
+            'Проверьте, что ответ 304 содержит ETag и не содержит тела.'
+        )
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что `{url}` учитывает If-Modified-Since.'
+        )
+        return etag
+
+    def test_01_lists(self, client, title):
+        for url in ('/api/v1/categories/', '/api/v1/genres/'):
+            etag = self.assert_not_modified(client, url)
+            response = client.get(url, HTTP_ACCEPT='application/msgpack')
+            assert response['ETag'] != etag, (
+                'Проверьте, что у JSON и msgpack разные ETag.'
+            )
+            response = client.get(f'{url}?search=drama')
+            assert response['ETag'] != etag, (
+                'Проверьте, что ETag зависит от параметров запроса.'
+            )
+
+        etag = client.get('/api/v1/categories/')['ETag']
+        Category.objects.create(name='Книги', slug='books')
+        response = client.get('/api/v1/categories/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новая категория меняет ETag списка.'
+        )
+
+    def test_02_title(self, client, title, author):
+        url = f'/api/v1/titles/{title.id}/'
+        etag = self.assert_not_modified(client, url)
+
+        def changes():
+            category = Category.objects.get(slug='films')
+            category.name = 'Кино'
+            category.save()
+            yield 'переименование категории'
+            genre = Genre.objects.get(slug='drama')
+            genre.name = 'Трагедия'
+            genre.save()
+            yield 'переименование жанра'
+            title.genre.add(Genre.objects.create(name='Боевик', slug='action'))
+            yield 'новый жанр произведения'
+            Review.objects.create(author=author, title=title, text='ок',
+                                  score=7)
+            yield 'новый отзыв'
+
+        for change in changes():
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что {change} меняет ETag произведения.'
+            )
+            assert response['ETag'] != etag
+            etag = response['ETag']
+
+    def test_03_missing_title(self, client):
+        for url in ('/api/v1/titles/0/', '/api/v1/titles/abc/'):
+            response = client.get(url, HTTP_IF_NONE_MATCH='"x"')
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что `{url}` возвращает 404.'
+            )
+            assert not response.has_header('ETag')
+
+    def test_04_category_deleted(self, client, title):
+        past = timezone.now() - timedelta(hours=1)
+        Title.objects.update(updated_at=past)
+        Category.objects.update(updated_at=past)
+        Genre.objects.update(updated_at=past)
+        url = f'/api/v1/titles/{title.id}/'
+        last_modified = client.get(url)['Last-Modified']
+        Category.objects.get(slug='films').delete()
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что удаление категории сдвигает Last-Modified '
+            'её произведений.'
+        )
+        assert response.json()['category'] is None
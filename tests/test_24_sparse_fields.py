@@ -0,0 +1,103 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24SparseFields:
+
+    @pytest.fixture(autouse=True)
+    def review(self, title, author):
+        title.description = 'Боевик'
+        title.save()
+        review = Review.objects.create(author=author, title=title,
+                                       text='Отлично', score=9)
+        Comment.objects.create(author=author, review=review, text='Согласен')
+        return review
+
+    def get(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что `{url}` возвращает 200.'
+        )
+        return response.json(), context.captured_queries
+
+    def test_01_fields(self, client, settings, title, review):
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        base = f'/api/v1/titles/{title.id}'
+        for url, fields in (
+            ('/api/v1/titles/', ('id', 'name', 'rating')),
+            (f'{base}/', ('category', 'year')),
+            (f'{base}/reviews/', ('score', 'author')),
+            (f'{base}/reviews/?cursor=', ('id', 'pub_date')),
+            (f'{base}/reviews/{review.id}/', ('text',)),
+            (f'{base}/reviews/{review.id}/comments/', ('id', 'author')),
+        ):
+            full, full_queries = self.get(client, url)
+            separator = '&' if '?' in url else '?'
+            sparse, sparse_queries = self.get(
+                client, f'{url}{separator}fields={",".join(fields)}')
+            if 'results' in full:
+                full, sparse = full['results'][0], sparse['results'][0]
+            assert sparse == {name: full[name] for name in full
+                              if name in fields}, (
+                f'Проверьте, что `{url}` с ?fields= отдаёт только '
+                'запрошенные поля с теми же значениями.'
+            )
+            assert len(sparse_queries) <= len(full_queries)
+            assert sum(len(query['sql']) for query in sparse_queries) < sum(
+                len(query['sql']) for query in full_queries), (
+                f'Проверьте, что `{url}` с ?fields= не читает лишние '
+                'колонки и связи.'
+            )
+
+    def test_02_queries(self, client, title):
+        _, queries = self.get(client, '/api/v1/titles/?fields=id,name,rating')
+        assert len(queries) == 2, (
+            'Проверьте, что без genre жанры не загружаются prefetch_related.'
+        )
+        assert not any('reviews_category' in query['sql']
+                       or 'description' in query['sql']
+                       for query in queries), (
+            'Проверьте, что без category и description их нет в запросе.'
+        )
+        _, queries = self.get(
+            client, f'/api/v1/titles/{title.id}/reviews/?fields=id,score')
+        assert not any('reviews_user' in query['sql'] for query in queries), (
+            'Проверьте, что без author отзывы не соединяются с '
+            'пользователями.'
+        )
+
+    def test_03_unknown_field(self, client):
+        response = client.get('/api/v1/titles/?fields=id,secret')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неизвестное поле в ?fields= возвращает 400.'
+        )
+        assert 'fields' in response.json()
+        response = client.get('/api/v1/titles/?fields=')
+        assert response.status_code == HTTPStatus.OK
+        assert 'genre' in response.json()['results'][0], (
+            'Проверьте, что пустой ?fields= отдаёт все поля.'
+        )
+
+    def test_04_etag(self, client, title, genre):
+        url = f'/api/v1/titles/{title.id}/?fields=name,rating'
+        etag = client.get(url)['ETag']
+        genre.name = 'Трагедия'
+        genre.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что ETag без genre не зависит от имени жанра.'
+        )
+        author = User.objects.create(username='other',
+                                     email='other@yamdb.fake')
+        Review.objects.create(author=author, title=title, text='ок', score=1)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {'name': 'Терминатор', 'rating': 5.0}
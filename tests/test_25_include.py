@@ -0,0 +1,89 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Comment, Review, User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Include:
+
+    def add_reviews(self, title, reviews, comments):
+        for number in range(reviews):
+            author = User.objects.create(username=f'author{number}',
+                                         email=f'author{number}@yamdb.fake')
+            review = Review.objects.create(author=author, title=title,
+                                           text=f'Отзыв {number}', score=5)
+            Comment.objects.bulk_create(
+                Comment(author=author, review=review, text=f'Ответ {index}')
+                for index in range(comments))
+
+    def test_01_embedded(self, client, settings, title):
+        settings.INCLUDE_REVIEWS_LIMIT = 2
+        settings.INCLUDE_COMMENTS_LIMIT = 2
+        self.add_reviews(title, reviews=3, comments=3)
+        url = f'/api/v1/titles/{title.id}/'
+        response = client.get(f'{url}?include=reviews.comments')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert {name: value for name, value in data.items()
+                if name != 'reviews'} == client.get(url).json(), (
+            'Проверьте, что ?include= не меняет поля произведения.'
+        )
+        reviews = data['reviews']
+        page = client.get(f'{url}reviews/?limit=2').json()
+        assert reviews['count'] == 3 and reviews['next'].endswith(
+            f'{url}reviews/?limit=2&offset=2'), (
+            'Проверьте, что встроенные отзывы содержат count и ссылку '
+            'на следующую страницу.'
+        )
+        assert [{name: value for name, value in review.items()
+                 if name != 'comments'}
+                for review in reviews['results']] == page['results'], (
+            'Проверьте, что встроены первые отзывы списка отзывов.'
+        )
+        for review in reviews['results']:
+            comments = client.get(
+                f'{url}reviews/{review["id"]}/comments/?limit=2').json()
+            assert review['comments']['count'] == 3
+            assert review['comments']['results'] == comments['results'], (
+                'Проверьте, что встроены первые комментарии каждого отзыва.'
+            )
+
+        response = client.get(f'{url}?include=reviews')
+        assert 'comments' not in response.json()['reviews']['results'][0], (
+            'Проверьте, что без reviews.comments комментарии не встраиваются.'
+        )
+
+    @pytest.mark.parametrize('reviews,comments', ((1, 1), (12, 5)))
+    def test_02_fixed_queries(self, client, django_assert_num_queries,
+                              title, reviews, comments):
+        self.add_reviews(title, reviews, comments)
+        url = f'/api/v1/titles/{title.id}/?include=reviews.comments'
+        # Произведение, жанры, отзывы с числом комментариев, комментарии.
+        with django_assert_num_queries(4):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_03_not_cached(self, client, title):
+        self.add_reviews(title, reviews=1, comments=0)
+        url = f'/api/v1/titles/{title.id}/?include=reviews.comments'
+        client.get(url)
+        review = Review.objects.get()
+        Comment.objects.create(author=review.author, review=review,
+                               text='Новый ответ')
+        response = client.get(url)
+        comments = response.json()['reviews']['results'][0]['comments']
+        assert comments['count'] == 1, (
+            'Проверьте, что новый комментарий сразу виден во встроенных '
+            'комментариях.'
+        )
+
+    def test_04_unknown_include(self, client, title):
+        response = client.get(f'/api/v1/titles/{title.id}/?include=author')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неизвестная связь в ?include= возвращает 400.'
+        )
+        assert 'include' in response.json()
+        response = client.get('/api/v1/titles/0/?include=reviews')
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,88 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Genre, Review, Title
+
+URL = '/api/v1/titles/batch/'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26TitlesBatch:
+
+    @pytest.fixture
+    def titles(self, category, genre, author):
+        genres = [genre, Genre.objects.create(name='Комедия', slug='comedy')]
+        titles = []
+        for number in range(5):
+            title = Title.objects.create(name=f'Фильм {number}', year=2000,
+                                         category=category)
+            title.genre.set(genres[:number % 2 + 1])
+            Review.objects.create(author=author, title=title, text='ок',
+                                  score=number + 1)
+            titles.append(title)
+        return titles
+
+    def test_01_order_and_missing(self, client, titles):
+        missing = titles[-1].id + 100
+        ids = [titles[3].id, titles[0].id, missing, titles[4].id,
+               titles[0].id]
+        response = client.post(URL, data={'ids': ids},
+                               content_type='application/json')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что POST-запрос к `{URL}` доступен без токена '
+            'и возвращает 200.'
+        )
+        data = response.json()
+        assert data['missing'] == [missing], (
+            'Проверьте, что несуществующие id перечисляются в missing.'
+        )
+        expected = [titles[3].id, titles[0].id, titles[4].id]
+        assert [title['id'] for title in data['results']] == expected, (
+            'Проверьте, что произведения возвращаются в порядке id '
+            'из запроса, без повторов.'
+        )
+        for title in data['results']:
+            url = f'/api/v1/titles/{title["id"]}/'
+            assert title == client.get(url).json(), (
+                'Проверьте, что произведения в пакете совпадают с '
+                'ответом на запрос одного произведения.'
+            )
+
+    def test_02_fixed_queries(self, client, titles,
+                              django_assert_num_queries):
+        # Произведения с категориями одним запросом и жанры вторым.
+        with django_assert_num_queries(2):
+            response = client.post(
+                URL, data={'ids': [title.id for title in titles]},
+                content_type='application/json')
+        assert len(response.json()['results']) == len(titles)
+        response = client.post(
+            f'{URL}?fields=id,rating', data={'ids': [titles[1].id]},
+            content_type='application/json')
+        assert response.json()['results'] == [{'id': titles[1].id,
+                                               'rating': 2.0}], (
+            'Проверьте, что пакетный запрос поддерживает ?fields=.'
+        )
+
+    @pytest.mark.parametrize('data', (
+        {}, {'ids': []}, {'ids': ['abc']}, {'ids': list(range(1, 202))},
+    ))
+    def test_03_invalid(self, client, data):
+        response = client.post(URL, data=data,
+                               content_type='application/json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что POST-запрос к `{URL}` с {data} возвращает 400.'
+        )
+
+    def test_04_ignores_filters(self, client, titles):
+        ids = [title.id for title in titles[:2]]
+        response = client.post(f'{URL}?year=1999&genre=comedy',
+                               data={'ids': ids},
+                               content_type='application/json')
+        data = response.json()
+        assert [title['id'] for title in data['results']] == ids, (
+            'Проверьте, что параметры фильтрации списка не исключают '
+            'произведения из пакетного ответа.'
+        )
+        assert data['missing'] == []
@@ -0,0 +1,99 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Avg
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title, User
+
+
+def assert_ratings():
+    for title in Title.objects.all():
+        reviews = Review.objects.filter(title=title)
+        expected = reviews.aggregate(rating=Avg('score'))['rating']
+        assert (title.rating, title.review_count) == (
+            expected, reviews.count()), (
+            f'Проверьте, что рейтинг произведения `{title}` совпадает '
+            'со средней оценкой его отзывов.'
+        )
+
+
+def count_title_updates(queries):
+    return sum(query['sql'].startswith('UPDATE "reviews_title"')
+               for query in queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27TitleRating:
+
+    @pytest.fixture
+    def titles(self):
+        titles = [Title.objects.create(name=f'Фильм {number}', year=2000)
+                  for number in range(3)]
+        for number in range(6):
+            author = User.objects.create(username=f'author{number}',
+                                         email=f'author{number}@yamdb.fake')
+            for title in titles:
+                review = Review.objects.create(author=author, title=title,
+                                               text='Отзыв',
+                                               score=number + 1)
+                Comment.objects.create(author=author, review=review,
+                                       text='Ответ')
+        return titles
+
+    def test_01_update(self, titles):
+        review = Review.objects.filter(title=titles[0]).first()
+        review.score = 10
+        review.save()
+        assert_ratings()
+        review.title = Title.objects.create(name='Новый', year=2001)
+        review.save()
+        assert_ratings()
+
+    def test_02_delete(self, titles):
+        Review.objects.filter(title=titles[0]).first().delete()
+        assert_ratings()
+        for review in Review.objects.filter(title=titles[1]):
+            review.delete()
+        assert Title.objects.get(pk=titles[1].pk).rating is None, (
+            'Проверьте, что без отзывов рейтинг произведения пустой.'
+        )
+        assert_ratings()
+
+    def test_03_delete_title(self, titles):
+        with CaptureQueriesContext(connection) as context:
+            titles[0].delete()
+        assert not count_title_updates(context.captured_queries), (
+            'Проверьте, что удаление произведения не пересчитывает рейтинг '
+            'по каждому его отзыву.'
+        )
+        assert_ratings()
+
+    def test_04_delete_user(self, titles):
+        with CaptureQueriesContext(connection) as context:
+            User.objects.get(username='author1').delete()
+        assert count_title_updates(context.captured_queries) == 1, (
+            'Проверьте, что удаление автора пересчитывает рейтинг '
+            'его произведений одним запросом.'
+        )
+        assert_ratings()
+        User.objects.filter(username__in=('author2', 'author3')).delete()
+        assert_ratings()
+
+    def test_05_bulk_delete(self, titles):
+        with CaptureQueriesContext(connection) as context:
+            Review.objects.filter(score__gt=3).delete()
+        assert count_title_updates(context.captured_queries) == 1, (
+            'Проверьте, что массовое удаление отзывов пересчитывает рейтинг '
+            'одним запросом.'
+        )
+        assert_ratings()
+
+    def test_06_recalc_ratings(self, titles):
+        Title.objects.update(score_sum=0, review_count=0, rating=None)
+        out = StringIO()
+        call_command('recalc_ratings', stdout=out)
+        assert 'Рейтинг пересчитан для 3 произведений' in out.getvalue()
+        assert_ratings()
@@ -0,0 +1,52 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from api.management.commands import explain_queries
+
+
+def explain(*args):
+    out = StringIO()
+    call_command('explain_queries', *args, no_color=True, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28ExplainQueries:
+
+    @pytest.fixture
+    def data(self):
+        call_command('generate_data', titles=20, users=10, reviews=60,
+                     comments=20, genres=3, categories=2)
+
+    def test_01_scan_lines(self):
+        for line in ('SCAN reviews_title', 'SCAN TABLE reviews_title',
+                     'SCAN reviews_title USING INDEX title_year',
+                     'SCAN reviews_user USING COVERING INDEX '
+                     'sqlite_autoindex_reviews_user_1'):
+            assert explain_queries.TABLE_SCAN_RE.match(line), (
+                f'Проверьте, что `{line}` считается полным проходом.'
+            )
+        for line in ('SEARCH reviews_title USING INTEGER PRIMARY KEY '
+                     '(rowid=?)',
+                     'SCAN reviews_title_fts VIRTUAL TABLE INDEX 0:M2',
+                     'USE TEMP B-TREE FOR ORDER BY'):
+            assert not explain_queries.TABLE_SCAN_RE.match(line), (
+                f'Проверьте, что `{line}` не считается полным проходом.'
+            )
+
+    def test_02_allowed_lists(self, data):
+        output = explain('--fail-on-scan')
+        assert output.rstrip().endswith('Полных проходов таблиц: 0'), (
+            'Проверьте, что проходы постраничных списков разрешены, а '
+            'фильтры, поиск и вложенные ресурсы идут по индексам.'
+        )
+        assert 'SCAN reviews_user' in output
+
+    def test_03_fail_on_scan(self, data, monkeypatch):
+        monkeypatch.setattr(explain_queries, 'ENDPOINTS',
+                            ('/api/v1/titles/?name={search}',))
+        with pytest.raises(CommandError, match='Полных проходов таблиц'):
+            explain('--fail-on-scan')